@@ -1,102 +1,217 @@
+import numpy as np
 import pandas as pd
-from typing import List, Dict
-from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+from itertools import combinations
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from utils._njit import njit, prange
+
+# Column layout of find_opportunities_array results
+OPPORTUNITY_DTYPE = np.dtype([
+    ('buy_exchange', 'U32'),
+    ('sell_exchange', 'U32'),
+    ('buy_price', 'f8'),
+    ('sell_price', 'f8'),
+    ('spread_percent', 'f8'),
+    ('potential_profit_percent', 'f8')
+])
+
+@njit(cache=True)
+def _effective_price(levels: np.ndarray, amount: float) -> float:
+    """Average fill price across (price, size) orderbook levels; NaN when liquidity runs out"""
+    prices = levels[:, 0]
+    sizes = levels[:, 1]
+    cum_sizes = np.cumsum(sizes)
+
+    # First level at which the cumulative size covers the order
+    k = np.searchsorted(cum_sizes, amount)
+    if k == cum_sizes.shape[0]:  # Not enough liquidity
+        return np.nan
+
+    filled = cum_sizes[k - 1] if k > 0 else 0.0
+    total_cost = (prices[:k] * sizes[:k]).sum() + prices[k] * (amount - filled)
+    return total_cost / amount
+
+@njit(cache=True, parallel=True)
+def _scan_spreads(prices: np.ndarray, fee_rate: float):
+    """Spread and fee-adjusted profit percent for every symbol and buy/sell exchange pair
+
+    `prices` is (symbols, exchanges) with NaN for missing quotes; results are
+    (symbols, buy exchange, sell exchange) with NaN on the diagonal.
+    """
+    n_symbols, n_exchanges = prices.shape
+    spreads = np.full((n_symbols, n_exchanges, n_exchanges), np.nan)
+    profits = np.full((n_symbols, n_exchanges, n_exchanges), np.nan)
+
+    for s in prange(n_symbols):
+        for i in range(n_exchanges):
+            buy = prices[s, i]
+            for j in range(n_exchanges):
+                if i != j:
+                    sell = prices[s, j]
+                    spread = (sell - buy) / buy * 100
+                    spreads[s, i, j] = spread
+                    profits[s, i, j] = spread - (buy + sell) * fee_rate / buy * 100
+
+    return spreads, profits
+
+def warm_up_kernels():
+    """Compile the spread and fill-price kernels, or load them from numba's on-disk cache, ahead of first use"""
+    _scan_spreads(np.ones((2, 2)), 0.001)
+    _effective_price(np.ones((2, 2)), 1.0)
+
+def _to_levels(orders: List) -> np.ndarray:
+    """Convert raw orderbook levels into a 2D float64 array"""
+    levels = np.asarray(orders, dtype=np.float64)
+    if levels.ndim != 2:
+        levels = levels.reshape(0, 2)
+    return levels
 
 class ArbitrageDetector:
-    def __init__(self, data_collector):
+    def __init__(self, data_collector, max_workers: int = 8):
         self.data_collector = data_collector
-        self.spread_cache = {}
-        self.last_update = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
         self.min_profit_threshold = 0.001  # 0.1% minimum profit after fees
         self.fee_rate = 0.001  # 0.1% fee per trade
 
+    def close(self):
+        """Release the fetch worker threads"""
+        self.executor.shutdown(wait=False)
+
+    def __del__(self):
+        # Detectors dropped from a resource cache must not leave idle threads behind
+        executor = getattr(self, 'executor', None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _fetch_all(self, fetch, exchanges: List[str]) -> Dict:
+        """Run a blocking per-exchange fetch concurrently, keyed by exchange"""
+        # Each call is a network round trip, so overlapping them bounds the
+        # wall time by the slowest exchange instead of the sum of all of them
+        return dict(zip(exchanges, self.executor.map(fetch, exchanges)))
+
     def find_opportunities(self, symbol: str, exchanges: List[str]) -> List[Dict]:
         """Find arbitrage opportunities for a symbol across exchanges"""
-        opportunities = []
-        current_prices = {}
-        
-        # Get current prices from all exchanges
-        for exchange in exchanges:
-            ticker = self.data_collector.get_ticker(symbol, exchange)
+        opportunities = self.find_opportunities_array(symbol, exchanges)
+        fields = opportunities.dtype.names
+        return [{'symbol': symbol, **dict(zip(fields, row))} for row in opportunities.tolist()]
+
+    def _subscribe(self, symbols: List[str], exchanges: List[str]):
+        """Keep WebSocket streams open for every scanned quote so rescans read them from memory"""
+        for symbol in symbols:
+            for exchange in exchanges:
+                self.data_collector.subscribe(symbol, exchange)
+
+    def find_opportunities_array(self, symbol: str, exchanges: List[str]) -> np.ndarray:
+        """Find arbitrage opportunities as a structured array sorted by profit"""
+        self._subscribe([symbol], exchanges)
+
+        # Get current prices from all exchanges (I/O-bound, fetched concurrently)
+        tickers = self._fetch_all(
+            lambda exchange: self.data_collector.get_ticker(symbol, exchange), exchanges)
+
+        exchange_names = []
+        prices = []
+        for exchange, ticker in tickers.items():
             if ticker and ticker['last']:
-                current_prices[exchange] = ticker['last']
+                exchange_names.append(exchange)
+                prices.append(ticker['last'])
         
-        if len(current_prices) < 2:
-            return []
-
-        # Compare prices between exchanges
-        for i, (ex1, price1) in enumerate(current_prices.items()):
-            for ex2, price2 in list(current_prices.items())[i+1:]:
-                # Calculate spread percentage
-                spread = ((price2 - price1) / price1) * 100
-                
-                # Calculate fees
-                fee_cost = (price1 * self.fee_rate) + (price2 * self.fee_rate)
-                profit_after_fees = abs(price2 - price1) - fee_cost
-                
-                # Convert to percentage
-                profit_percent = (profit_after_fees / price1) * 100
-                
-                if profit_percent > self.min_profit_threshold:
-                    if price2 > price1:
-                        opportunities.append({
-                            'symbol': symbol,
-                            'buy_exchange': ex1,
-                            'sell_exchange': ex2,
-                            'buy_price': price1,
-                            'sell_price': price2,
-                            'spread_percent': spread,
-                            'potential_profit_percent': profit_percent
-                        })
-                    else:
-                        opportunities.append({
-                            'symbol': symbol,
-                            'buy_exchange': ex2,
-                            'sell_exchange': ex1,
-                            'buy_price': price2,
-                            'sell_price': price1,
-                            'spread_percent': -spread,
-                            'potential_profit_percent': profit_percent
-                        })
-
-        return sorted(opportunities, key=lambda x: x['potential_profit_percent'], reverse=True)
+        if len(prices) < 2:
+            return np.empty(0, dtype=OPPORTUNITY_DTYPE)
+
+        # Compare every (buy, sell) exchange pair at once: rows are the buy
+        # side, columns the sell side (CPU-bound but tiny: N x N floats)
+        prices = np.asarray(prices, dtype=np.float64)
+        buy_prices = prices[:, None]
+        sell_prices = prices[None, :]
+        spread_mat = (sell_prices - buy_prices) / buy_prices * 100
+        fee_mat = (buy_prices + sell_prices) * self.fee_rate / buy_prices * 100
+        profit_mat = spread_mat - fee_mat
+        np.fill_diagonal(profit_mat, -np.inf)
+
+        buy_idx, sell_idx = np.nonzero(profit_mat > self.min_profit_threshold)
+        order = np.argsort(-profit_mat[buy_idx, sell_idx], kind='stable')
+        buy_idx, sell_idx = buy_idx[order], sell_idx[order]
+
+        names = np.asarray(exchange_names, dtype=OPPORTUNITY_DTYPE['buy_exchange'])
+        opportunities = np.empty(len(order), dtype=OPPORTUNITY_DTYPE)
+        opportunities['buy_exchange'] = names[buy_idx]
+        opportunities['sell_exchange'] = names[sell_idx]
+        opportunities['buy_price'] = prices[buy_idx]
+        opportunities['sell_price'] = prices[sell_idx]
+        opportunities['spread_percent'] = spread_mat[buy_idx, sell_idx]
+        opportunities['potential_profit_percent'] = profit_mat[buy_idx, sell_idx]
+        return opportunities
+
+    def find_opportunities_batch(self, symbols: List[str], exchanges: List[str]) -> List[Dict]:
+        """Find arbitrage opportunities for many symbols in one scan, sorted by profit"""
+        self._subscribe(symbols, exchanges)
+
+        # One bulk ticker request per exchange covers every symbol
+        tickers = self._fetch_all(
+            lambda exchange: self.data_collector.get_tickers_bulk(symbols, exchange), exchanges)
+
+        prices = np.full((len(symbols), len(exchanges)), np.nan)
+        for j, exchange in enumerate(exchanges):
+            exchange_tickers = tickers[exchange]
+            for i, symbol in enumerate(symbols):
+                ticker = exchange_tickers.get(symbol)
+                if ticker and ticker['last']:
+                    prices[i, j] = ticker['last']
+
+        # CPU-bound: compiled kernel, parallel over symbols
+        spreads, profits = _scan_spreads(prices, self.fee_rate)
+
+        # NaN (missing quotes, diagonal) never compares above the threshold
+        sym_idx, buy_idx, sell_idx = np.nonzero(profits > self.min_profit_threshold)
+        hit_profits = profits[sym_idx, buy_idx, sell_idx]
+        order = np.argsort(-hit_profits, kind='stable')
+
+        opportunities = []
+        for k in order:
+            s, i, j = sym_idx[k], buy_idx[k], sell_idx[k]
+            opportunities.append({
+                'symbol': symbols[s],
+                'buy_exchange': exchanges[i],
+                'sell_exchange': exchanges[j],
+                'buy_price': float(prices[s, i]),
+                'sell_price': float(prices[s, j]),
+                'spread_percent': float(spreads[s, i, j]),
+                'potential_profit_percent': float(hit_profits[k])
+            })
+
+        return opportunities
 
     def get_historical_spreads(self, symbol: str, exchanges: List[str],
                              timeframe: str = '5m', days: int = 1) -> pd.DataFrame:
         """Calculate historical price spreads between exchanges"""
-        dfs = {}
-        
-        # Get historical data from all exchanges
-        for exchange in exchanges:
+        def fetch_closes(exchange):
+            # Per-exchange preparation runs on the worker alongside the fetch
             df = self.data_collector.get_historical_data(symbol, exchange, timeframe, days)
-            if not df.empty:
-                dfs[exchange] = df
+            return None if df.empty else df['close']
 
-        if len(dfs) < 2:
+        # Get historical close prices from all exchanges
+        closes = {
+            exchange: close
+            for exchange, close in self._fetch_all(fetch_closes, exchanges).items()
+            if close is not None
+        }
+
+        if len(closes) < 2:
             return pd.DataFrame()
 
-        # Calculate spreads between exchanges
+        # Align close prices from every exchange on a shared timestamp index;
+        # the data is already fetched at `timeframe`, so no resample is needed
+        closes = pd.concat(closes, axis=1)
+
+        # Calculate spreads between exchanges (CPU-bound: the index alignment
+        # and per-pair Series arithmetic are the main offline hotspot)
         spread_data = {}
-        exchanges_list = list(dfs.keys())
-        
-        for i, ex1 in enumerate(exchanges_list):
-            for ex2 in exchanges_list[i+1:]:
-                # Resample and align timeframes
-                df1 = dfs[ex1].resample(timeframe).last()
-                df2 = dfs[ex2].resample(timeframe).last()
-                
-                # Calculate spread percentage
-                common_index = df1.index.intersection(df2.index)
-                if len(common_index) > 0:
-                    spread = ((df2.loc[common_index, 'close'] - 
-                             df1.loc[common_index, 'close']) / 
-                            df1.loc[common_index, 'close'] * 100)
-                    spread_data[f"{ex1}-{ex2}"] = spread
-
-        if spread_data:
-            return pd.DataFrame(spread_data)
-        return pd.DataFrame()
+        for ex1, ex2 in combinations(closes.columns, 2):
+            spread_data[f"{ex1}-{ex2}"] = (closes[ex2] - closes[ex1]) / closes[ex1] * 100
+
+        return pd.DataFrame(spread_data, index=closes.index).dropna(how='all')
 
     def get_best_execution_path(self, symbol: str, exchanges: List[str],
                               amount: float) -> Dict:
@@ -104,8 +219,10 @@ class ArbitrageDetector:
         orderbooks = {}
         
         # Get orderbook data from all exchanges
-        for exchange in exchanges:
-            ob = self.data_collector.get_orderbook(symbol, exchange)
+        books = self._fetch_all(
+            lambda exchange: self.data_collector.get_orderbook(symbol, exchange), exchanges)
+
+        for exchange, ob in books.items():
             if ob:
                 orderbooks[exchange] = ob
 
@@ -119,50 +236,47 @@ class ArbitrageDetector:
             'execution_details': {}
         }
 
+        # Effective prices only depend on one side of one book, so walk each
+        # book once instead of once per exchange pair (CPU-bound, compiled)
+        buy_prices = {}
+        sell_prices = {}
+        for exchange, ob in orderbooks.items():
+            buy_prices[exchange] = self._calculate_effective_price(ob['asks'], amount)
+            sell_prices[exchange] = self._calculate_effective_price(ob['bids'], amount)
+
         # Compare liquidity and prices across exchanges
-        for ex1, ob1 in orderbooks.items():
-            for ex2, ob2 in orderbooks.items():
-                if ex1 != ex2:
-                    # Calculate effective prices including slippage
-                    buy_price = self._calculate_effective_price(ob1['asks'], amount)
-                    sell_price = self._calculate_effective_price(ob2['bids'], amount)
+        for ex1 in orderbooks:
+            buy_price = buy_prices[ex1]
+            if not buy_price:
+                continue
+
+            for ex2 in orderbooks:
+                sell_price = sell_prices[ex2]
+                if ex1 != ex2 and sell_price:
+                    # Calculate profit after fees
+                    fees = (buy_price * amount * self.fee_rate +
+                           sell_price * amount * self.fee_rate)
+                    profit = (sell_price - buy_price) * amount - fees
                     
-                    if buy_price and sell_price:
-                        # Calculate profit after fees
-                        fees = (buy_price * amount * self.fee_rate +
-                               sell_price * amount * self.fee_rate)
-                        profit = (sell_price - buy_price) * amount - fees
-                        
-                        if profit > best_path['expected_profit']:
-                            best_path = {
-                                'buy_exchange': ex1,
-                                'sell_exchange': ex2,
-                                'expected_profit': profit,
-                                'execution_details': {
-                                    'buy_price': buy_price,
-                                    'sell_price': sell_price,
-                                    'amount': amount,
-                                    'fees': fees,
-                                    'net_profit': profit
-                                }
+                    if profit > best_path['expected_profit']:
+                        best_path = {
+                            'buy_exchange': ex1,
+                            'sell_exchange': ex2,
+                            'expected_profit': profit,
+                            'execution_details': {
+                                'buy_price': buy_price,
+                                'sell_price': sell_price,
+                                'amount': amount,
+                                'fees': fees,
+                                'net_profit': profit
                             }
+                        }
 
         return best_path
 
-    def _calculate_effective_price(self, orders: List, amount: float) -> float:
+    def _calculate_effective_price(self, orders: List, amount: float) -> Optional[float]:
         """Calculate effective price for a given order size including slippage"""
-        remaining = amount
-        total_cost = 0
-        
-        for price, size in orders:
-            if remaining <= 0:
-                break
-            
-            executed = min(remaining, size)
-            total_cost += executed * price
-            remaining -= executed
-            
-        if remaining > 0:  # Not enough liquidity
+        price = _effective_price(_to_levels(orders), float(amount))
+        if np.isnan(price):  # Not enough liquidity
             return None
-            
-        return total_cost / amount
\ No newline at end of file
+        return float(price)
@@ -1,64 +1,103 @@
+import asyncio
+import threading
 import ccxt
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+import requests
+from requests.adapters import HTTPAdapter
 import os
+import time
 from dotenv import load_dotenv
 import logging
-from typing import Optional, Dict
+from collections import OrderedDict
+from typing import Optional, Dict, List
+from utils.cache import TieredCache, TTLCache, dumps_frame, loads_frame
 
 # Load environment variables
 load_dotenv()
 
+# Exchange classes resolved once instead of via getattr on every lookup
+EXCHANGE_CLASSES = {exchange_id: getattr(ccxt, exchange_id) for exchange_id in ccxt.exchanges}
+
+# Connections kept open per exchange host, enough for the dashboard's
+# concurrent fetches without discarding pooled connections
+HTTP_POOL_SIZE = 16
+
+# WebSocket streams kept open at once; the least recently requested symbol
+# is dropped when a new one would exceed this
+MAX_STREAMS = 32
+
 class ExchangeDataCollector:
     def __init__(self):
         self.exchanges = {}
-        self.data_cache = {}
-        self.ticker_cache = {}
-        self.last_ticker_update = {}
+        self.data_cache = TieredCache('ohlcv', ttl=60, dumps=dumps_frame, loads=loads_frame)
+        self.ticker_cache = TieredCache('ticker', ttl=10)
+        self.orderbook_cache = TTLCache(ttl=5)
+
+        # One keep-alive HTTP session shared by every REST client, so TLS
+        # connections are reused across calls instead of renegotiated
+        self.session = requests.Session()
+        self.session.headers['Connection'] = 'keep-alive'
+        self.session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=HTTP_POOL_SIZE))
+
+        # WebSocket streams keyed by (exchange, symbol), run on a background
+        # event loop when subscribed
+        self.stream_exchanges = {}
+        self.streams = OrderedDict()
+        self._no_streams = set()
+        self._stream_loop = None
+        self._stream_thread = None
+        self._stream_lock = threading.Lock()
     
     def _get_exchange(self, exchange_id: str) -> ccxt.Exchange:
         """Get or create exchange instance"""
-        if exchange_id not in self.exchanges:
-            try:
-                exchange_class = getattr(ccxt, exchange_id)
-                self.exchanges[exchange_id] = exchange_class({
-                    'enableRateLimit': True,
-                    'timeout': 30000,
-                })
-            except Exception as e:
-                logging.error(f"Error initializing {exchange_id}: {e}")
-                return None
-        return self.exchanges[exchange_id]
+        try:
+            return self.exchanges[exchange_id]
+        except KeyError:
+            pass
+
+        exchange_class = EXCHANGE_CLASSES.get(exchange_id)
+        if exchange_class is None:
+            logging.error(f"Error initializing {exchange_id}: unsupported exchange")
+            return None
+
+        try:
+            exchange = exchange_class({
+                'enableRateLimit': True,
+                'timeout': 30000,
+                'session': self.session,
+            })
+        except Exception as e:
+            logging.error(f"Error initializing {exchange_id}: {e}")
+            return None
+
+        # Concurrent first calls may race here; keep whichever instance won
+        return self.exchanges.setdefault(exchange_id, exchange)
 
     def get_historical_data(self, symbol: str, exchange_id: str, 
                           timeframe: str = '5m', days: int = 5) -> pd.DataFrame:
         """Fetch historical OHLCV data"""
         cache_key = f"{exchange_id}_{symbol}_{timeframe}_{days}"
         
-        # Check cache (valid for 1 minute)
-        if cache_key in self.data_cache:
-            cache_time, df = self.data_cache[cache_key]
-            if (datetime.now() - cache_time).total_seconds() < 60:
-                return df
+        # Cached for 1 minute
+        df = self.data_cache.get_or_set(
+            cache_key,
+            lambda: self._fetch_historical_data(symbol, exchange_id, timeframe, days)
+        )
+        return df if df is not None else pd.DataFrame()
 
+    def _fetch_historical_data(self, symbol: str, exchange_id: str,
+                               timeframe: str, days: int) -> Optional[pd.DataFrame]:
+        """Fetch OHLCV data from the exchange, returning None on failure"""
         try:
             exchange = self._get_exchange(exchange_id)
             if not exchange:
-                return pd.DataFrame()
-
-            # Calculate timeframe in milliseconds
-            timeframe_ms = {
-                '1m': 60000,
-                '5m': 300000,
-                '15m': 900000,
-                '1h': 3600000,
-                '4h': 14400000,
-                '1d': 86400000
-            }
-            
-            since = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
+                return None
+
+            # Millisecond epoch computed with integer math, no datetime objects
+            since = time.time_ns() // 1_000_000 - days * 86_400_000
             
-            # Fetch OHLCV data
+            # Fetch OHLCV data (I/O-bound: one REST round trip, dominates this call)
             ohlcv = exchange.fetch_ohlcv(
                 symbol, 
                 timeframe=timeframe,
@@ -67,44 +106,41 @@ class ExchangeDataCollector:
             )
             
             if not ohlcv:
-                return pd.DataFrame()
+                return None
             
-            # Convert to DataFrame
+            # Convert the list of rows to float64 in one bulk pass (missing
+            # values become NaN) and hand pandas a single 2D block
+            data = np.asarray(ohlcv, dtype=np.float64)
             df = pd.DataFrame(
-                ohlcv,
-                columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
+                data[:, 1:6],
+                columns=['open', 'high', 'low', 'close', 'volume'],
+                index=pd.to_datetime(data[:, 0].astype(np.int64), unit='ms')
             )
-            
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            
-            # Cache the result
-            self.data_cache[cache_key] = (datetime.now(), df)
+            df.index.name = 'timestamp'
             return df
             
         except Exception as e:
             logging.error(f"Error fetching data for {symbol} on {exchange_id}: {e}")
-            return pd.DataFrame()
+            return None
 
     def get_ticker(self, symbol: str, exchange_id: str) -> Optional[Dict]:
         """Get current ticker data"""
-        cache_key = f"{exchange_id}_{symbol}"
-        
-        # Check cache (valid for 10 seconds)
-        current_time = datetime.now()
-        if cache_key in self.ticker_cache and cache_key in self.last_ticker_update:
-            if (current_time - self.last_ticker_update[cache_key]).total_seconds() < 10:
-                return self.ticker_cache[cache_key]
+        # Cached for 10 seconds
+        return self.ticker_cache.get_or_set(
+            f"{exchange_id}_{symbol}",
+            lambda: self._fetch_ticker(symbol, exchange_id)
+        )
 
+    def _fetch_ticker(self, symbol: str, exchange_id: str) -> Optional[Dict]:
+        """Fetch a ticker from the exchange, returning None on failure"""
         try:
             exchange = self._get_exchange(exchange_id)
             if not exchange:
                 return None
 
+            # I/O-bound: REST round trip; the cache and streams avoid most of them
             ticker = exchange.fetch_ticker(symbol)
             if ticker:
-                self.ticker_cache[cache_key] = ticker
-                self.last_ticker_update[cache_key] = current_time
                 return ticker
                 
         except Exception as e:
@@ -112,15 +148,215 @@ class ExchangeDataCollector:
             
         return None
 
+    def get_tickers_bulk(self, symbols: List[str], exchange_id: str) -> Dict[str, Dict]:
+        """Get current tickers for several symbols in one request where supported"""
+        tickers = {}
+        missing = []
+        for symbol in symbols:
+            ticker = self.ticker_cache.get(f"{exchange_id}_{symbol}")
+            if ticker is not None:
+                tickers[symbol] = ticker
+            else:
+                missing.append(symbol)
+
+        if not missing:
+            return tickers
+
+        exchange = self._get_exchange(exchange_id)
+        if not exchange:
+            return tickers
+
+        # Fall back to one request per symbol when there is no bulk endpoint
+        if not exchange.has.get('fetchTickers'):
+            for symbol in missing:
+                ticker = self.get_ticker(symbol, exchange_id)
+                if ticker:
+                    tickers[symbol] = ticker
+            return tickers
+
+        try:
+            fetched = exchange.fetch_tickers(missing)
+        except Exception as e:
+            logging.error(f"Error fetching tickers for {missing} on {exchange_id}: {e}")
+            return tickers
+
+        for symbol in missing:
+            ticker = fetched.get(symbol)
+            if ticker:
+                self.ticker_cache.set(f"{exchange_id}_{symbol}", ticker)
+                tickers[symbol] = ticker
+
+        return tickers
+
     def get_orderbook(self, symbol: str, exchange_id: str, limit: int = 20) -> Optional[Dict]:
         """Get current orderbook"""
+        # Serve from the WebSocket stream while it is fresh
+        orderbook = self.orderbook_cache.get(f"{exchange_id}_{symbol}")
+        if orderbook is not None:
+            return {
+                'asks': orderbook['asks'][:limit],
+                'bids': orderbook['bids'][:limit],
+                'timestamp': orderbook['timestamp']
+            }
+
         try:
             exchange = self._get_exchange(exchange_id)
             if not exchange:
                 return None
 
+            # I/O-bound: REST round trip, only taken when no fresh stream snapshot exists
             return exchange.fetch_order_book(symbol, limit=limit)
             
         except Exception as e:
             logging.error(f"Error fetching orderbook for {symbol} on {exchange_id}: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def subscribe(self, symbol: str, exchange_id: str) -> bool:
+        """Stream ticker and orderbook updates for a symbol over WebSocket
+
+        While updates keep arriving, get_ticker and get_orderbook are served
+        from memory; if a stream stalls they fall back to REST once the
+        cached value expires.
+        """
+        stream_key = (exchange_id, symbol)
+
+        with self._stream_lock:
+            if stream_key in self.streams:
+                self.streams.move_to_end(stream_key)
+                return True
+            if exchange_id in self._no_streams:
+                return False
+
+            exchange = self.stream_exchanges.get(exchange_id)
+            if exchange is None:
+                exchange = self._create_stream_exchange(exchange_id)
+                if exchange is None:
+                    self._no_streams.add(exchange_id)
+                    return False
+                self.stream_exchanges[exchange_id] = exchange
+
+            if self._stream_loop is None:
+                self._stream_loop = asyncio.new_event_loop()
+                self._stream_thread = threading.Thread(
+                    target=self._stream_loop.run_forever,
+                    name='crossx-streams',
+                    daemon=True
+                )
+                self._stream_thread.start()
+
+            # Stagger subscriptions so a large watchlist does not open every
+            # socket at once and stall the exchange handshake
+            delay = 0.05 * len(self.streams)
+            self.streams[stream_key] = asyncio.run_coroutine_threadsafe(
+                self._watch(exchange, symbol, f"{exchange_id}_{symbol}", delay), self._stream_loop
+            )
+            while len(self.streams) > MAX_STREAMS:
+                self._stop_stream(*next(iter(self.streams)))
+        return True
+
+    def _create_stream_exchange(self, exchange_id: str):
+        """Create a ccxt.pro client, or None when the exchange has no WebSocket API"""
+        try:
+            # Imported on first use: most callers never stream
+            import ccxt.pro
+
+            exchange_class = getattr(ccxt.pro, exchange_id, None)
+            if exchange_class is None:
+                logging.error(f"No WebSocket support for {exchange_id}")
+                return None
+            return exchange_class({'enableRateLimit': True})
+        except Exception as e:
+            logging.error(f"Error initializing {exchange_id} streams: {e}")
+            return None
+
+    def unsubscribe(self, symbol: str, exchange_id: str):
+        """Stop streaming updates for a symbol"""
+        with self._stream_lock:
+            self._stop_stream(exchange_id, symbol)
+
+    def _stop_stream(self, exchange_id: str, symbol: str):
+        """Cancel a stream and close its exchange client after the last one; needs the stream lock"""
+        stream = self.streams.pop((exchange_id, symbol), None)
+        if stream is None:
+            return
+        stream.cancel()
+
+        if not any(key[0] == exchange_id for key in self.streams):
+            exchange = self.stream_exchanges.pop(exchange_id)
+            asyncio.run_coroutine_threadsafe(self._close_exchange(exchange), self._stream_loop)
+
+    @staticmethod
+    async def _close_exchange(exchange):
+        """Close a ccxt.pro client's sockets once its watchers have been cancelled"""
+        await asyncio.sleep(0)
+        try:
+            await exchange.close()
+        except Exception as e:
+            logging.error(f"Error closing stream client: {e}")
+
+    @staticmethod
+    async def _drain():
+        """Wait for every other task on the stream loop to finish"""
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        if tasks:
+            await asyncio.wait(tasks, timeout=5)
+
+    def close(self):
+        """Stop every stream, close the WebSocket clients and the event loop, and release the HTTP session"""
+        with self._stream_lock:
+            for key in list(self.streams):
+                self._stop_stream(*key)
+            loop, self._stream_loop = self._stream_loop, None
+            thread, self._stream_thread = self._stream_thread, None
+
+        if loop is not None:
+            # Let cancelled watchers and pending client closes finish first
+            try:
+                asyncio.run_coroutine_threadsafe(self._drain(), loop).result(timeout=10)
+            except Exception as e:
+                logging.error(f"Error stopping streams: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            if not thread.is_alive():
+                loop.close()
+
+        self.session.close()
+
+    async def _watch(self, exchange, symbol: str, key: str, delay: float):
+        """Keep the ticker and orderbook caches updated from WebSocket pushes"""
+        await asyncio.sleep(delay)
+
+        async def watch_ticker():
+            while True:
+                try:
+                    ticker = await exchange.watch_ticker(symbol)
+                    # Only the in-process tier: pushes are too frequent for Redis
+                    self.ticker_cache.local.set(key, ticker)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"Ticker stream error for {key}: {e}")
+                    await asyncio.sleep(1)
+
+        async def watch_order_book():
+            while True:
+                try:
+                    orderbook = await exchange.watch_order_book(symbol)
+                    # Snapshot the levels; ccxt mutates the book in place
+                    self.orderbook_cache.set(key, {
+                        'asks': [level[:2] for level in orderbook['asks']],
+                        'bids': [level[:2] for level in orderbook['bids']],
+                        'timestamp': orderbook.get('timestamp')
+                    })
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"Orderbook stream error for {key}: {e}")
+                    await asyncio.sleep(1)
+
+        watchers = []
+        if exchange.has.get('watchTicker'):
+            watchers.append(watch_ticker())
+        if exchange.has.get('watchOrderBook'):
+            watchers.append(watch_order_book())
+        await asyncio.gather(*watchers)
@@ -1,7 +1,282 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+import hashlib
 import pandas_ta as ta
+from numpy.lib.stride_tricks import sliding_window_view
+from utils._njit import njit, prange, NUMBA_AVAILABLE
+
+# Column layout of the structured trade records returned by Strategy.backtest
+TRADE_DTYPE = np.dtype([
+    ('entry_time', 'datetime64[ns]'),
+    ('exit_time', 'datetime64[ns]'),
+    ('side', 'i1'),  # 1 = long, -1 = short
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('pnl', 'f8'),
+    ('balance', 'f8')
+])
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _first_touch(high, low, valid, start, side, stop_loss, take_profit):
+        """First bar from `start` touching the stop or target, and whether it was the stop
+
+        Returns -1 when neither level is touched.
+        """
+        for i in range(start, high.shape[0]):
+            if not valid[i]:
+                continue
+            if side == 1:
+                if low[i] <= stop_loss:
+                    return i, True
+                if high[i] >= take_profit:
+                    return i, False
+            else:
+                if high[i] >= stop_loss:
+                    return i, True
+                if low[i] <= take_profit:
+                    return i, False
+        return -1, False
+else:
+    def _first_touch(high, low, valid, start, side, stop_loss, take_profit):
+        """First bar from `start` touching the stop or target, and whether it was the stop
+
+        Without numba a scalar loop runs in the interpreter, so scan with
+        vectorized masks in doubling windows; the cost follows the holding
+        period rather than the remaining series. Returns -1 when neither
+        level is touched.
+        """
+        n = high.shape[0]
+        width = 32
+        while start < n:
+            stop = min(start + width, n)
+            if side == 1:
+                stop_hit = low[start:stop] <= stop_loss
+                target_hit = high[start:stop] >= take_profit
+            else:
+                stop_hit = high[start:stop] >= stop_loss
+                target_hit = low[start:stop] <= take_profit
+
+            hit = valid[start:stop] & (stop_hit | target_hit)
+            j = np.argmax(hit)
+            if hit[j]:
+                return start + j, bool(stop_hit[j])
+
+            start = stop
+            width *= 2
+
+        return -1, False
+
+def _fillna_close(values: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Fill NaN entries of a freshly computed indicator array with close, in place"""
+    if not values.flags.writeable:  # Read-only view of a pandas result
+        values = values.copy()
+    np.copyto(values, close, where=np.isnan(values))
+    return values
+
+def _ema(values: np.ndarray, length: int) -> np.ndarray:
+    """EMA seeded with the SMA of the first `length` values, as in TA-Lib and pandas_ta"""
+    seeded = np.array(values, dtype=np.float64)
+    if len(seeded) < length:
+        return np.full(len(seeded), np.nan)
+
+    window = seeded[:length]
+    window = window[~np.isnan(window)]
+    seeded[:length - 1] = np.nan
+    seeded[length - 1] = window.mean() if len(window) else np.nan
+
+    # pandas' ewm runs in compiled code, unlike a recursive per-element EMA
+    return pd.Series(seeded).ewm(span=length, adjust=False).mean().to_numpy()
+
+def _macd(values: np.ndarray, fast: int = 12, slow: int = 26,
+          signal: int = 9) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """MACD line, signal and histogram built from _ema; None for too short a series"""
+    if len(values) < slow + signal - 1:
+        return None
+
+    line = _ema(values, fast) - _ema(values, slow)
+
+    # The signal EMA starts at the first defined MACD value
+    signal_line = np.full(len(line), np.nan)
+    valid = np.flatnonzero(~np.isnan(line))
+    if len(valid):
+        signal_line[valid[0]:] = _ema(line[valid[0]:], signal)
+
+    return line, signal_line, line - signal_line
+
+def _bbands(values: np.ndarray, length: int = 5, num_std: float = 2.0) -> Optional[np.ndarray]:
+    """Bollinger upper/middle/lower bands as (bars, 3) columns; None for too short a series"""
+    if len(values) < length:
+        return None
+
+    # Reduce a strided (bars - length + 1, length) view of the windows in C
+    # instead of calling a function per window
+    windows = sliding_window_view(values, length)
+    middle = windows.mean(axis=1)
+    band = num_std * windows.std(axis=1, ddof=1)
+
+    bands = np.full((len(values), 3), np.nan)
+    bands[length - 1:, 0] = middle + band
+    bands[length - 1:, 1] = middle
+    bands[length - 1:, 2] = middle - band
+    return bands
+
+@njit(cache=True)
+def _backtest_core(high, low, close, atr, signal, initial_balance,
+                   sl_mult, tp_mult, risk):
+    """ATR stop-loss/take-profit backtest as a first-touch scan per trade
+
+    Only entry bars are visited: each trade's exit is the first later bar
+    touching its stop or target, and entry signals before that exit are
+    skipped. Returns the equity curve and per-trade arrays (entry/exit bar
+    index, side as 1/-1, entry/exit price, pnl and balance after the trade).
+    """
+    n = close.shape[0]
+    valid = ~np.isnan(atr)  # Bars without ATR are skipped entirely
+    valid[0] = False  # Trading starts from the second bar
+    entries = np.flatnonzero(valid & ((signal == 1) | (signal == -1)))
+
+    # At most one trade per entry signal
+    n_max = entries.shape[0]
+    entry_idx = np.empty(n_max, np.int64)
+    exit_idx = np.empty(n_max, np.int64)
+    sides = np.empty(n_max, np.int8)
+    entry_px = np.empty(n_max)
+    exit_px = np.empty(n_max)
+    pnls = np.empty(n_max)
+    balances = np.empty(n_max)
+    n_trades = 0
+
+    balance = initial_balance
+    closed_at_end = False
+    t = 0
+    while t < n_max:
+        # Position state is kept in scalar locals, not a record or dict, so
+        # the compiled loop holds it in registers
+        e = entries[t]
+        side = 1 if signal[e] == 1 else -1
+        entry = close[e]
+        stop_distance = atr[e] * sl_mult
+        size = balance * risk / stop_distance
+        stop_loss = entry - side * stop_distance
+        take_profit = entry + side * (atr[e] * tp_mult)
+
+        x, stopped = _first_touch(high, low, valid, e + 1, side, stop_loss, take_profit)
+        if x >= 0:
+            exit_price = stop_loss if stopped else take_profit
+        else:
+            # Close any open position at the end
+            x = n - 1
+            exit_price = close[x]
+            closed_at_end = True
+
+        pnl = (exit_price - entry) * size * side
+        balance += pnl
+        entry_idx[n_trades] = e
+        exit_idx[n_trades] = x
+        sides[n_trades] = side
+        entry_px[n_trades] = entry
+        exit_px[n_trades] = exit_price
+        pnls[n_trades] = pnl
+        balances[n_trades] = balance
+        n_trades += 1
+
+        if closed_at_end:
+            break
+        # A new position can open on the exit bar itself
+        t = np.searchsorted(entries, x)
+
+    # Balance is piecewise constant, stepping at each exit bar
+    steps = np.empty(n_trades + 1)
+    steps[0] = initial_balance
+    steps[1:] = balances[:n_trades]
+    bounds = np.empty(n_trades + 2, np.int64)
+    bounds[0] = 0
+    bounds[1:-1] = exit_idx[:n_trades]
+    bounds[-1] = n
+    equity = np.repeat(steps, np.diff(bounds))
+    equity[~valid] = initial_balance
+    if closed_at_end:
+        equity[n - 1] = balance
+
+    return (equity, entry_idx[:n_trades], exit_idx[:n_trades], sides[:n_trades],
+            entry_px[:n_trades], exit_px[:n_trades], pnls[:n_trades], balances[:n_trades])
+
+@njit(cache=True, parallel=True)
+def _sweep_core(high, low, close, atr, signal, initial_balance,
+                sl_mults, tp_mults, risks):
+    """Run _backtest_core for every parameter set in parallel
+
+    Returns final balance, trade count, winning trade count and max drawdown
+    percent per parameter set.
+    """
+    n_params = sl_mults.shape[0]
+    final_balances = np.empty(n_params)
+    n_trades = np.empty(n_params, np.int64)
+    n_wins = np.empty(n_params, np.int64)
+    max_drawdowns = np.empty(n_params)
+
+    for p in prange(n_params):
+        equity, _, _, _, _, _, pnls, _ = _backtest_core(
+            high, low, close, atr, signal, initial_balance, sl_mults[p], tp_mults[p], risks[p])
+
+        # Running peak; NaN balances never raise the peak or the drawdown
+        peak = equity[0]
+        max_drawdown = 0.0
+        for value in equity:
+            if value > peak:
+                peak = value
+            drawdown = (peak - value) / peak * 100
+            if drawdown > max_drawdown:
+                max_drawdown = drawdown
+
+        final_balances[p] = equity[-1]
+        n_trades[p] = pnls.shape[0]
+        n_wins[p] = (pnls > 0).sum()
+        max_drawdowns[p] = max_drawdown
+
+    return final_balances, n_trades, n_wins, max_drawdowns
+
+@njit(cache=True, parallel=True)
+def _batch_core(high, low, close, atr, signal, lengths, initial_balance,
+                sl_mult, tp_mult, risk):
+    """Run _backtest_core for every row of (symbols, bars) arrays in parallel
+
+    Rows are left-aligned and only their first `lengths[s]` bars are used.
+    Returns the NaN-padded equity matrix, trade count and winning trade
+    count per symbol.
+    """
+    n_symbols, n_bars = close.shape
+    equity = np.full((n_symbols, n_bars), np.nan)
+    n_trades = np.zeros(n_symbols, np.int64)
+    n_wins = np.zeros(n_symbols, np.int64)
+
+    for s in prange(n_symbols):
+        n = lengths[s]
+        row_equity, _, _, _, _, _, pnls, _ = _backtest_core(
+            high[s, :n], low[s, :n], close[s, :n], atr[s, :n], signal[s, :n],
+            initial_balance, sl_mult, tp_mult, risk)
+        equity[s, :n] = row_equity
+        n_trades[s] = pnls.shape[0]
+        n_wins[s] = (pnls > 0).sum()
+
+    return equity, n_trades, n_wins
+
+def warm_up_kernels():
+    """Compile the backtest kernels, or load them from numba's on-disk cache, ahead of first use"""
+    # Same array layouts as the real calls: DataFrame.to_numpy hands back a
+    # Fortran-ordered block, so its columns are C-contiguous, and batches
+    # pass C-contiguous rows
+    data = np.ones((4, 5), order='F')
+    columns = (data[:, 0], data[:, 1], data[:, 2], data[:, 3], data[:, 4])
+    params = np.ones(1)
+    _backtest_core(*columns, 1.0, 2.0, 3.0, 0.02)
+    _sweep_core(*columns, 1.0, params, params, params)
+
+    rows = np.ones((5, 1, 4))
+    _batch_core(rows[0], rows[1], rows[2], rows[3], rows[4], np.array([4], dtype=np.int64),
+                1.0, 2.0, 3.0, 0.02)
 
 class Strategy:
     def __init__(self):
@@ -9,109 +284,160 @@ class Strategy:
         self.rsi_period = 14
         self.stop_loss_atr = 2.0
         self.take_profit_atr = 3.0
+        self.indicator_cache_size = 8
+        self._indicator_cache: Dict[Tuple, Dict[str, np.ndarray]] = {}
+
+    def _indicator_key(self, df: pd.DataFrame) -> Tuple:
+        """Cache key identifying the bars and parameters indicators depend on"""
+        prices = np.ascontiguousarray(df[['high', 'low', 'close']].to_numpy(np.float64))
+        digest = hashlib.blake2b(prices.tobytes(), digest_size=16).digest()
+        return (len(df), df.index[0], df.index[-1], digest, self.atr_period, self.rsi_period)
 
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calculate technical indicators for analysis"""
         if df.empty:
             return df
-            
-        # Create a copy to avoid SettingWithCopyWarning
-        df = df.copy()
+
+        # Repeated backtests over the same bars (e.g. parameter sweeps) reuse
+        # the indicator columns instead of recomputing them
+        key = self._indicator_key(df)
+        cached = self._indicator_cache.get(key)
+        if cached is not None:
+            return self._join_indicators(df, cached)
         
-        try:
-            # Moving Averages
-            df['sma_20'] = ta.sma(df['close'], length=20).fillna(df['close'])
-            df['sma_50'] = ta.sma(df['close'], length=50).fillna(df['close'])
-            df['sma_200'] = ta.sma(df['close'], length=200).fillna(df['close'])
-            
-            df['ema_8'] = ta.ema(df['close'], length=8).fillna(df['close'])
-            df['ema_21'] = ta.ema(df['close'], length=21).fillna(df['close'])
-            df['ema_55'] = ta.ema(df['close'], length=55).fillna(df['close'])
-            
-            # RSI
-            df['rsi'] = ta.rsi(df['close'], length=self.rsi_period).fillna(50)
-            
-            # MACD
-            macd = ta.macd(df['close'])
-            if macd is not None:
-                df['macd_line'] = macd['MACD_12_26_9'].fillna(0)
-                df['macd_signal'] = macd['MACDs_12_26_9'].fillna(0)
-                df['macd_hist'] = macd['MACDh_12_26_9'].fillna(0)
-            else:
-                df['macd_line'] = 0
-                df['macd_signal'] = 0
-                df['macd_hist'] = 0
-            
-            # ATR for volatility
-            df['atr'] = ta.atr(df['high'], df['low'], df['close'], length=self.atr_period)
-            df['atr'] = df['atr'].fillna(df['high'] - df['low'])
-            
-            # Bollinger Bands
-            bb = ta.bbands(df['close'])
-            if bb is not None:
-                # Get the first column names that contain upper, middle, and lower
-                bb_cols = bb.columns.tolist()
-                upper_col = next(col for col in bb_cols if 'BBU_' in col)
-                middle_col = next(col for col in bb_cols if 'BBM_' in col)
-                lower_col = next(col for col in bb_cols if 'BBL_' in col)
-                
-                df['bb_upper'] = bb[upper_col].fillna(df['close'])
-                df['bb_middle'] = bb[middle_col].fillna(df['close'])
-                df['bb_lower'] = bb[lower_col].fillna(df['close'])
-            else:
-                df['bb_upper'] = df['close']
-                df['bb_middle'] = df['close']
-                df['bb_lower'] = df['close']
-            
-        except Exception as e:
-            # If any calculation fails, set default values
-            for col in ['sma_20', 'sma_50', 'sma_200', 'ema_8', 'ema_21', 'ema_55']:
-                df[col] = df['close']
-            
-            df['rsi'] = 50
-            df['atr'] = df['high'] - df['low']
-            
-            df['macd_line'] = 0
-            df['macd_signal'] = 0
-            df['macd_hist'] = 0
-            
-            df['bb_upper'] = df['close']
-            df['bb_middle'] = df['close']
-            df['bb_lower'] = df['close']
+        # MACD needs 26 bars before any indicator is meaningful
+        if len(df) < 26:
+            indicators = self._default_indicators(df)
+        else:
+            indicators = self._compute_indicators(df)
+
+        # FIFO eviction keeps the cache bounded
+        self._indicator_cache[key] = indicators
+        while len(self._indicator_cache) > self.indicator_cache_size:
+            del self._indicator_cache[next(iter(self._indicator_cache))]
         
-        return df
+        return self._join_indicators(df, indicators)
+
+    def _compute_indicators(self, df: pd.DataFrame) -> Dict:
+        """Indicator columns for a series of at least 26 bars"""
+        # Fill gaps on the raw arrays in a single pass per indicator instead
+        # of materializing a second Series with fillna
+        close = df['close'].to_numpy(np.float64)
+        indicators = {}
+
+        # Moving Averages; pandas_ta returns None when the window is longer
+        # than the series, which falls back to close like the warm-up bars
+        for name, length in (('sma_20', 20), ('sma_50', 50), ('sma_200', 200)):
+            sma = ta.sma(df['close'], length=length)
+            values = np.full(len(close), np.nan) if sma is None else sma.to_numpy(np.float64)
+            indicators[name] = _fillna_close(values, close)
+
+        for name, length in (('ema_8', 8), ('ema_21', 21), ('ema_55', 55)):
+            values = _ema(close, length)
+            indicators[name] = _fillna_close(values, close)
+        
+        # RSI
+        rsi = ta.rsi(df['close'], length=self.rsi_period).to_numpy(np.float64)
+        indicators['rsi'] = np.nan_to_num(rsi, nan=50.0)
+        
+        # MACD
+        macd = _macd(close)
+        if macd is not None:
+            indicators['macd_line'] = np.nan_to_num(macd[0], nan=0.0)
+            indicators['macd_signal'] = np.nan_to_num(macd[1], nan=0.0)
+            indicators['macd_hist'] = np.nan_to_num(macd[2], nan=0.0)
+        else:
+            indicators['macd_line'] = 0
+            indicators['macd_signal'] = 0
+            indicators['macd_hist'] = 0
+        
+        # ATR for volatility
+        atr = ta.atr(df['high'], df['low'], df['close'], length=self.atr_period).to_numpy(np.float64)
+        bar_range = (df['high'] - df['low']).to_numpy(np.float64)
+        indicators['atr'] = _fillna_close(atr, bar_range)
+        
+        # Bollinger Bands
+        bb = _bbands(close)
+        if bb is not None:
+            values = _fillna_close(bb, close[:, None])
+            indicators['bb_upper'] = values[:, 0]
+            indicators['bb_middle'] = values[:, 1]
+            indicators['bb_lower'] = values[:, 2]
+        else:
+            indicators['bb_upper'] = close
+            indicators['bb_middle'] = close
+            indicators['bb_lower'] = close
+
+        return indicators
+
+    @staticmethod
+    def _default_indicators(df: pd.DataFrame) -> Dict:
+        """Neutral indicator columns for series too short to compute them"""
+        close = df['close'].to_numpy(np.float64)
+        indicators = {col: close for col in ['sma_20', 'sma_50', 'sma_200', 'ema_8', 'ema_21', 'ema_55']}
+        
+        indicators['rsi'] = 50
+        
+        indicators['macd_line'] = 0
+        indicators['macd_signal'] = 0
+        indicators['macd_hist'] = 0
+
+        indicators['atr'] = (df['high'] - df['low']).to_numpy(np.float64)
+        
+        indicators['bb_upper'] = close
+        indicators['bb_middle'] = close
+        indicators['bb_lower'] = close
+        return indicators
+
+    @staticmethod
+    def _join_indicators(df: pd.DataFrame, indicators: Dict) -> pd.DataFrame:
+        """New frame with the indicator columns appended in a single concat"""
+        # Building the columns into one block avoids a BlockManager insert per
+        # column, and the concat is the only copy of the input frame
+        existing = df.columns.intersection(list(indicators))
+        if len(existing):
+            df = df.drop(columns=existing)
+        return pd.concat([df, pd.DataFrame(indicators, index=df.index)], axis=1)
+
+    def _compute_entry_signals(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Long and short entry conditions for every bar as boolean arrays"""
+        ema_21 = df['ema_21'].to_numpy(np.float64)
+        ema_55 = df['ema_55'].to_numpy(np.float64)
+        close = df['close'].to_numpy(np.float64)
+        rsi = df['rsi'].to_numpy(np.float64)
+        macd_line = df['macd_line'].to_numpy(np.float64)
+        macd_signal = df['macd_signal'].to_numpy(np.float64)
+
+        # Conditions are evaluated on the raw arrays; NaN compares False, so
+        # missing values never produce a signal
+        long_entry = (
+            (ema_21 > ema_55) &  # Trend filter
+            (close > ema_21) &    # Price above EMA21
+            (rsi > 50) &                # RSI momentum
+            (macd_line > macd_signal)  # MACD crossover
+        )
+        short_entry = (
+            (ema_21 < ema_55) &  # Trend filter
+            (close < ema_21) &    # Price below EMA21
+            (rsi < 50) &                # RSI momentum
+            (macd_line < macd_signal)  # MACD crossover
+        )
+
+        return long_entry, short_entry
 
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
         """Generate trading signals based on Moth Scalping strategy"""
         if df.empty:
             return df
             
-        # Create a copy to avoid SettingWithCopyWarning
-        df = df.copy()
+        # calculate_indicators returns a new frame, so the signal column
+        # never writes into the caller's data
         df = self.calculate_indicators(df)
         
-        # Initialize signal column
-        df['signal'] = 0
-        
-        # Long entry conditions with NaN handling
-        long_condition = (
-            (df['ema_21'] > df['ema_55']) &  # Trend filter
-            (df['close'] > df['ema_21']) &    # Price above EMA21
-            (df['rsi'] > 50) &                # RSI momentum
-            (df['macd_line'] > df['macd_signal'])  # MACD crossover
-        ).fillna(False)
-        
-        # Short entry conditions with NaN handling
-        short_condition = (
-            (df['ema_21'] < df['ema_55']) &  # Trend filter
-            (df['close'] < df['ema_21']) &    # Price below EMA21
-            (df['rsi'] < 50) &                # RSI momentum
-            (df['macd_line'] < df['macd_signal'])  # MACD crossover
-        ).fillna(False)
-        
-        # Set signals
-        df.loc[long_condition, 'signal'] = 1
-        df.loc[short_condition, 'signal'] = -1
+        long_condition, short_condition = self._compute_entry_signals(df)
+
+        # Set signals in one pass; the trend filters make the two exclusive
+        df['signal'] = np.where(long_condition, 1, np.where(short_condition, -1, 0))
         
         return df
 
@@ -122,165 +448,158 @@ class Strategy:
             return {
                 'equity_curve': [initial_balance],
                 'trades': [],
+                'trade_records': np.empty(0, dtype=TRADE_DTYPE),
                 'total_return': 0,
                 'win_rate': 0,
                 'total_trades': 0,
                 'max_drawdown': 0
             }
         
-        # Create a copy to avoid SettingWithCopyWarning
-        df = df.copy()
         df = self.generate_signals(df)
         
-        balance = initial_balance
-        position = None
-        equity_curve = [initial_balance] * len(df)  # Initialize with initial balance for all points
-        trades = []
-        
-        for i in range(1, len(df)):
-            current_bar = df.iloc[i]
-            prev_bar = df.iloc[i-1]
-            
-            # Skip if no ATR value
-            if pd.isna(current_bar['atr']):
-                continue
-            
-            # Check for position exit
-            if position:
-                # Calculate stop loss and take profit
-                if position['side'] == 'long':
-                    stop_loss = position['entry'] - (position['atr'] * self.stop_loss_atr)
-                    take_profit = position['entry'] + (position['atr'] * self.take_profit_atr)
-                    
-                    # Check if stopped out
-                    if current_bar['low'] <= stop_loss:
-                        pnl = (stop_loss - position['entry']) * position['size']
-                        balance += pnl
-                        trades.append({
-                            'entry_time': position['time'],
-                            'exit_time': current_bar.name,
-                            'side': position['side'],
-                            'entry_price': position['entry'],
-                            'exit_price': stop_loss,
-                            'pnl': pnl,
-                            'balance': balance
-                        })
-                        position = None
-                    
-                    # Check if take profit hit
-                    elif current_bar['high'] >= take_profit:
-                        pnl = (take_profit - position['entry']) * position['size']
-                        balance += pnl
-                        trades.append({
-                            'entry_time': position['time'],
-                            'exit_time': current_bar.name,
-                            'side': position['side'],
-                            'entry_price': position['entry'],
-                            'exit_price': take_profit,
-                            'pnl': pnl,
-                            'balance': balance
-                        })
-                        position = None
-                
-                else:  # Short position
-                    stop_loss = position['entry'] + (position['atr'] * self.stop_loss_atr)
-                    take_profit = position['entry'] - (position['atr'] * self.take_profit_atr)
-                    
-                    # Check if stopped out
-                    if current_bar['high'] >= stop_loss:
-                        pnl = (position['entry'] - stop_loss) * position['size']
-                        balance += pnl
-                        trades.append({
-                            'entry_time': position['time'],
-                            'exit_time': current_bar.name,
-                            'side': position['side'],
-                            'entry_price': position['entry'],
-                            'exit_price': stop_loss,
-                            'pnl': pnl,
-                            'balance': balance
-                        })
-                        position = None
-                    
-                    # Check if take profit hit
-                    elif current_bar['low'] <= take_profit:
-                        pnl = (position['entry'] - take_profit) * position['size']
-                        balance += pnl
-                        trades.append({
-                            'entry_time': position['time'],
-                            'exit_time': current_bar.name,
-                            'side': position['side'],
-                            'entry_price': position['entry'],
-                            'exit_price': take_profit,
-                            'pnl': pnl,
-                            'balance': balance
-                        })
-                        position = None
-            
-            # Check for new position entry
-            if not position and not pd.isna(current_bar['atr']):
-                if current_bar['signal'] == 1:  # Long signal
-                    risk_amount = balance * risk_per_trade
-                    position_size = risk_amount / (current_bar['atr'] * self.stop_loss_atr)
-                    position = {
-                        'side': 'long',
-                        'entry': current_bar['close'],
-                        'time': current_bar.name,
-                        'size': position_size,
-                        'atr': current_bar['atr']
-                    }
-                
-                elif current_bar['signal'] == -1:  # Short signal
-                    risk_amount = balance * risk_per_trade
-                    position_size = risk_amount / (current_bar['atr'] * self.stop_loss_atr)
-                    position = {
-                        'side': 'short',
-                        'entry': current_bar['close'],
-                        'time': current_bar.name,
-                        'size': position_size,
-                        'atr': current_bar['atr']
-                    }
-            
-            # Update equity curve at the current position
-            equity_curve[i] = balance
-        
-        # Close any open position at the end
-        if position:
-            exit_price = df['close'].iloc[-1]
-            if position['side'] == 'long':
-                pnl = (exit_price - position['entry']) * position['size']
-            else:
-                pnl = (position['entry'] - exit_price) * position['size']
-            
-            balance += pnl
-            trades.append({
-                'entry_time': position['time'],
-                'exit_time': df.index[-1],
-                'side': position['side'],
-                'entry_price': position['entry'],
+        data = df[['high', 'low', 'close', 'atr', 'signal']].to_numpy(np.float64)
+        equity, entry_idx, exit_idx, sides, entry_px, exit_px, pnls, balances = _backtest_core(
+            data[:, 0], data[:, 1], data[:, 2], data[:, 3], data[:, 4],
+            float(initial_balance), self.stop_loss_atr, self.take_profit_atr, float(risk_per_trade)
+        )
+
+        # Fill the structured trade records one column at a time
+        entry_times = df.index[entry_idx]
+        exit_times = df.index[exit_idx]
+        trade_records = np.empty(len(pnls), dtype=TRADE_DTYPE)
+        trade_records['entry_time'] = entry_times.to_numpy()
+        trade_records['exit_time'] = exit_times.to_numpy()
+        trade_records['side'] = sides
+        trade_records['entry_price'] = entry_px
+        trade_records['exit_price'] = exit_px
+        trade_records['pnl'] = pnls
+        trade_records['balance'] = balances
+
+        # Dict records for existing callers, unboxed once per column rather
+        # than once per trade
+        trades = [
+            {
+                'entry_time': entry_time,
+                'exit_time': exit_time,
+                'side': 'long' if side == 1 else 'short',
+                'entry_price': entry_price,
                 'exit_price': exit_price,
                 'pnl': pnl,
-                'balance': balance
-            })
-            equity_curve[-1] = balance
-        
+                'balance': trade_balance
+            }
+            for entry_time, exit_time, side, entry_price, exit_price, pnl, trade_balance in zip(
+                entry_times, exit_times, sides.tolist(), entry_px.tolist(),
+                exit_px.tolist(), pnls.tolist(), balances.tolist())
+        ]
+
+        balance = float(equity[-1])
+        equity_curve = equity.tolist()
+
         # Calculate metrics
         total_return = ((balance - initial_balance) / initial_balance) * 100
-        win_trades = sum(1 for t in trades if t['pnl'] > 0)
-        win_rate = (win_trades / len(trades)) * 100 if trades else 0
+        win_rate = float((trade_records['pnl'] > 0).mean() * 100) if len(trade_records) else 0
         
-        # Calculate max drawdown
-        peak = initial_balance
-        max_drawdown = 0
-        for value in equity_curve:
-            peak = max(peak, value)
-            drawdown = (peak - value) / peak * 100
-            max_drawdown = max(max_drawdown, drawdown)
+        # Calculate max drawdown; fmax/nanmax skip NaN balances
+        peaks = np.fmax.accumulate(equity)
+        max_drawdown = float(np.nanmax((peaks - equity) / peaks * 100))
         
         return {
             'equity_curve': equity_curve,
             'trades': trades,
+            'trade_records': trade_records,
             'total_return': total_return,
             'win_rate': win_rate,
             'total_trades': len(trades),
             'max_drawdown': max_drawdown
-        }
\ No newline at end of file
+        }
+
+    def backtest_many(self, frames: Dict[str, pd.DataFrame], initial_balance: float = 10000,
+                      risk_per_trade: float = 0.02) -> Dict[str, Dict]:
+        """Backtest several symbols in one parallel kernel
+
+        Returns backtest() metrics and equity curve per symbol, without the
+        per-trade list.
+        """
+        results = {}
+        signals = {}
+        for symbol, df in frames.items():
+            if df.empty:
+                results[symbol] = {
+                    'equity_curve': [initial_balance],
+                    'total_return': 0,
+                    'win_rate': 0,
+                    'total_trades': 0,
+                    'max_drawdown': 0
+                }
+            else:
+                signals[symbol] = self.generate_signals(df)
+
+        if not signals:
+            return results
+
+        # Stack symbols into (field, symbol, bar) arrays, padded to the longest series
+        lengths = np.array([len(df) for df in signals.values()], dtype=np.int64)
+        data = np.full((5, len(signals), lengths.max()), np.nan)
+        for k, df in enumerate(signals.values()):
+            data[:, k, :lengths[k]] = df[['high', 'low', 'close', 'atr', 'signal']].to_numpy(np.float64).T
+
+        equity, n_trades, n_wins = _batch_core(
+            data[0], data[1], data[2], data[3], data[4], lengths,
+            float(initial_balance), self.stop_loss_atr, self.take_profit_atr, float(risk_per_trade)
+        )
+
+        # Drawdown for every symbol at once; NaN padding is ignored
+        peaks = np.fmax.accumulate(equity, axis=1)
+        max_drawdowns = np.nanmax((peaks - equity) / peaks * 100, axis=1)
+
+        for k, symbol in enumerate(signals):
+            final_balance = equity[k, lengths[k] - 1]
+            trades = int(n_trades[k])
+            results[symbol] = {
+                'equity_curve': equity[k, :lengths[k]].tolist(),
+                'total_return': float((final_balance - initial_balance) / initial_balance * 100),
+                'win_rate': n_wins[k] / trades * 100 if trades else 0,
+                'total_trades': trades,
+                'max_drawdown': float(max_drawdowns[k])
+            }
+
+        return {symbol: results[symbol] for symbol in frames}
+
+    def sweep(self, df: pd.DataFrame, param_grid: List[Dict],
+              initial_balance: float = 10000) -> List[Dict]:
+        """Backtest many stop-loss/take-profit/risk settings over the same bars
+
+        Each entry of param_grid may set 'stop_loss_atr', 'take_profit_atr' and
+        'risk_per_trade'; missing keys use the strategy defaults. Indicators and
+        signals are computed once and all settings run in one parallel kernel.
+        """
+        params = [{
+            'stop_loss_atr': p.get('stop_loss_atr', self.stop_loss_atr),
+            'take_profit_atr': p.get('take_profit_atr', self.take_profit_atr),
+            'risk_per_trade': p.get('risk_per_trade', 0.02)
+        } for p in param_grid]
+
+        if df.empty or not params:
+            return [{**p, 'total_return': 0, 'win_rate': 0, 'total_trades': 0, 'max_drawdown': 0}
+                    for p in params]
+
+        df = self.generate_signals(df)
+        data = df[['high', 'low', 'close', 'atr', 'signal']].to_numpy(np.float64)
+        final_balances, n_trades, n_wins, max_drawdowns = _sweep_core(
+            data[:, 0], data[:, 1], data[:, 2], data[:, 3], data[:, 4], float(initial_balance),
+            np.array([p['stop_loss_atr'] for p in params], dtype=np.float64),
+            np.array([p['take_profit_atr'] for p in params], dtype=np.float64),
+            np.array([p['risk_per_trade'] for p in params], dtype=np.float64)
+        )
+
+        return [
+            {
+                **p,
+                'total_return': (balance - initial_balance) / initial_balance * 100,
+                'win_rate': wins / trades * 100 if trades else 0,
+                'total_trades': trades,
+                'max_drawdown': max_drawdown
+            }
+            for p, balance, trades, wins, max_drawdown in zip(
+                params, final_balances.tolist(), n_trades.tolist(), n_wins.tolist(), max_drawdowns.tolist())
+        ]
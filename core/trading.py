@@ -1,18 +1,46 @@
-from datetime import datetime
-from typing import List, Dict, Optional
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Sequence, Tuple
 import logging
+import math
+import sys
+import time
+import numpy as np
 from dataclasses import dataclass
+from utils._njit import njit
 
-@dataclass
+_EPOCH = datetime(1970, 1, 1)
+
+def _to_ns(timestamp: Optional[datetime]) -> int:
+    """Nanoseconds since the epoch in UTC, for `timestamp` or for now when None"""
+    if timestamp is None:
+        return time.time_ns()
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // timedelta(microseconds=1) * 1000
+
+def _from_ns(ns: int) -> datetime:
+    """Naive UTC datetime for nanoseconds since the epoch"""
+    return _EPOCH + timedelta(microseconds=ns // 1000)
+
+# Times are kept as integer nanoseconds (naive UTC, like the OHLCV index)
+# and only turned into datetimes when displayed
+
+@dataclass(slots=True, frozen=True)
 class Position:
     symbol: str
     exchange: str
     side: str  # 'long' or 'short'
     entry_price: float
     position_size: float
-    entry_time: datetime
+    entry_time_ns: int
+    sign: int  # 1 for long, -1 for short
 
-@dataclass
+    @property
+    def entry_time(self) -> datetime:
+        return _from_ns(self.entry_time_ns)
+
+@dataclass(slots=True, frozen=True)
 class Trade:
     symbol: str
     exchange: str
@@ -20,29 +48,138 @@ class Trade:
     entry_price: float
     exit_price: float
     position_size: float
-    entry_time: datetime
-    exit_time: datetime
+    entry_time_ns: int
+    exit_time_ns: int
     pnl: float
     fees: float
 
+    @property
+    def entry_time(self) -> datetime:
+        return _from_ns(self.entry_time_ns)
+
+    @property
+    def exit_time(self) -> datetime:
+        return _from_ns(self.exit_time_ns)
+
+# Lazy %-style arguments: trade logging sits on the per-trade path and is
+# usually filtered out below INFO; routine trade events only reach it when
+# a PaperTrader is verbose
+logger = logging.getLogger(__name__)
+
+VALID_SIDES = frozenset(('long', 'short'))
+
+# Annualization constants, resolved once at import (numba freezes globals
+# into the compiled kernel)
+TRADING_DAYS = 252
+SQRT_TRADING_DAYS = math.sqrt(TRADING_DAYS)
+
+@njit(cache=True)
+def _equity_kernel(pnls, fees, initial_balance, rf_daily):
+    """Max drawdown percent and annualized Sharpe ratio of the balance curve traced by closed trades
+
+    Walks the trades once, deriving each return straight from its net P&L
+    and the balance before it, so no balance or returns array is built.
+    """
+    n = pnls.shape[0]
+    balance = initial_balance
+    peak = initial_balance
+    max_drawdown = 0.0
+
+    # Welford running mean/variance of per-trade excess returns
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        net = pnls[i] - fees[i]
+        r = net / balance - rf_daily
+        delta = r - mean
+        mean += delta / (i + 1)
+        m2 += delta * (r - mean)
+
+        balance += net
+        if balance > peak:
+            peak = balance
+        drawdown = (peak - balance) / peak
+        if drawdown > max_drawdown:
+            max_drawdown = drawdown
+
+    sharpe = 0.0
+    if n >= 2:
+        std = math.sqrt(m2 / n)  # Population std like ndarray.std()
+        if std != 0.0:
+            sharpe = SQRT_TRADING_DAYS * mean / std
+    return max_drawdown * 100, sharpe
+
+class _CompensatedSum:
+    """Running float total with Neumaier compensation, so rounding error does not grow with the trade count"""
+    __slots__ = ('total', 'compensation')
+
+    def __init__(self):
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def add(self, value: float):
+        total = self.total + value
+        if abs(self.total) >= abs(value):
+            self.compensation += (self.total - total) + value
+        else:
+            self.compensation += (value - total) + self.total
+        self.total = total
+
+    @property
+    def value(self) -> float:
+        return self.total + self.compensation
+
 class PaperTrader:
-    def __init__(self, initial_balance: float = 10000.0, fee_rate: float = 0.001):
+    def __init__(self, initial_balance: float = 10000.0, fee_rate: float = 0.001,
+                 verbose: bool = False, event_log_size: int = 10_000):
         self.initial_balance = initial_balance
         self.current_balance = initial_balance
         self.fee_rate = fee_rate
         self.open_positions: Dict[str, Position] = {}
-        self.closed_trades: List[Trade] = []
+
+        # Recent trade events as plain tuples, oldest dropped first:
+        # ('open', symbol, price, side, time_ns) and
+        # ('close', symbol, price, pnl, time_ns)
+        self.event_log: deque = deque(maxlen=event_log_size)
+        self.verbose = verbose
+
+        # Closed trades in a preallocated slot list grown by doubling alongside
+        # columnar copies of their P&L and fees for vectorized metrics, stored
+        # as contiguous rows of one block so growth is one allocation
+        self._trades: List[Optional[Trade]] = [None] * 1024
+        self._trade_columns = np.empty((2, 1024))
+        self._pnls, self._fees = self._trade_columns
+        self._n_trades = 0
+
+        # Running aggregates so polled summaries do not re-scan the buffers
+        self._total_pnl = _CompensatedSum()
+        self._total_fees = _CompensatedSum()
+        self._win_count = 0
+        self._loss_count = 0
+        self._total_profit = _CompensatedSum()
+        self._total_loss = _CompensatedSum()
+
+        # Generation bumped on every balance change; summaries computed at the
+        # current generation are served from the memo until the next trade
+        self._gen = 0
+        self._summary_memo = (-1, None)
+        self._metrics_memo = (-1, None)
         
     def open_position(self, symbol: str, exchange: str, price: float,
-                     size: float, side: str) -> Optional[Position]:
-        """Open a new position"""
-        if side not in ['long', 'short']:
-            logging.error(f"Invalid side: {side}")
+                     size: float, side: str,
+                     timestamp: Optional[datetime] = None) -> Optional[Position]:
+        """Open a new position, stamped with `timestamp` or the current time"""
+        if side not in VALID_SIDES:
+            logger.error("Invalid side: %s", side)
             return None
             
+        # Interned keys let later lookups with the same symbol string match
+        # on identity before falling back to a character comparison
+        symbol = sys.intern(symbol)
+
         # Check if position already exists
         if symbol in self.open_positions:
-            logging.error(f"Position already exists for {symbol}")
+            logger.error("Position already exists for %s", symbol)
             return None
             
         # Calculate required margin
@@ -50,7 +187,7 @@ class PaperTrader:
         fees = position_value * self.fee_rate
         
         if position_value + fees > self.current_balance:
-            logging.error("Insufficient balance")
+            logger.error("Insufficient balance")
             return None
             
         # Open position
@@ -60,30 +197,33 @@ class PaperTrader:
             side=side,
             entry_price=price,
             position_size=size,
-            entry_time=datetime.now()
+            entry_time_ns=_to_ns(timestamp),
+            sign=1 if side == 'long' else -1
         )
         
         self.open_positions[symbol] = position
         self.current_balance -= fees
+        self._gen += 1
         
-        logging.info(f"Opened {side} position for {symbol} at {price}")
+        self.event_log.append(('open', symbol, price, side, position.entry_time_ns))
+        if self.verbose:
+            logger.info("Opened %s position for %s at %s", side, symbol, price)
         return position
         
-    def close_position(self, symbol: str, price: float) -> Optional[Trade]:
-        """Close an existing position"""
-        position = self.open_positions.get(symbol)
-        if not position:
-            logging.error(f"No open position for {symbol}")
+    def close_position(self, symbol: str, price: float,
+                       timestamp: Optional[datetime] = None) -> Optional[Trade]:
+        """Close an existing position, stamped with `timestamp` or the current time"""
+        # Pop up front: every path past the check removes the position anyway
+        position = self.open_positions.pop(symbol, None)
+        if position is None:
+            logger.error("No open position for %s", symbol)
             return None
             
         # Calculate P&L
         position_value = price * position.position_size
         fees = position_value * self.fee_rate
         
-        if position.side == 'long':
-            pnl = (price - position.entry_price) * position.position_size
-        else:  # short
-            pnl = (position.entry_price - price) * position.position_size
+        pnl = position.sign * (price - position.entry_price) * position.position_size
             
         # Create trade record
         trade = Trade(
@@ -93,43 +233,182 @@ class PaperTrader:
             entry_price=position.entry_price,
             exit_price=price,
             position_size=position.position_size,
-            entry_time=position.entry_time,
-            exit_time=datetime.now(),
+            entry_time_ns=position.entry_time_ns,
+            exit_time_ns=_to_ns(timestamp),
             pnl=pnl,
             fees=fees
         )
         
-        # Update balance and remove position
+        # Update balance
         self.current_balance += pnl - fees
-        self.closed_trades.append(trade)
-        del self.open_positions[symbol]
+        self._record_trade(trade)
         
-        logging.info(f"Closed {position.side} position for {symbol} at {price}, PnL: {pnl:.2f}")
+        self.event_log.append(('close', symbol, price, pnl, trade.exit_time_ns))
+        if self.verbose:
+            logger.info("Closed %s position for %s at %s, PnL: %.2f", position.side, symbol, price, pnl)
         return trade
+
+    def close_positions_bulk(self, symbols: Sequence[str], prices: Sequence[float],
+                             timestamp: Optional[datetime] = None) -> List[Trade]:
+        """Close several positions at once, computing their P&L as arrays"""
+        exit_time_ns = _to_ns(timestamp)
+
+        positions = []
+        exit_prices = []
+        for symbol, price in zip(symbols, np.asarray(prices, dtype=np.float64).tolist()):
+            position = self.open_positions.pop(symbol, None)
+            if position is None:
+                logger.error("No open position for %s", symbol)
+                continue
+            positions.append(position)
+            exit_prices.append(price)
+
+        if not positions:
+            return []
+
+        n = len(positions)
+        exit_px = np.asarray(exit_prices)
+        entry_px = np.fromiter((p.entry_price for p in positions), dtype=np.float64, count=n)
+        sizes = np.fromiter((p.position_size for p in positions), dtype=np.float64, count=n)
+        signs = np.fromiter((p.sign for p in positions), dtype=np.float64, count=n)
+
+        pnls = signs * (exit_px - entry_px) * sizes
+        fees = exit_px * sizes * self.fee_rate
+
+        self.current_balance += float((pnls - fees).sum())
+
+        trades = [
+            Trade(
+                symbol=position.symbol,
+                exchange=position.exchange,
+                side=position.side,
+                entry_price=position.entry_price,
+                exit_price=price,
+                position_size=position.position_size,
+                entry_time_ns=position.entry_time_ns,
+                exit_time_ns=exit_time_ns,
+                pnl=pnl,
+                fees=fee
+            )
+            for position, price, pnl, fee in zip(positions, exit_prices, pnls.tolist(), fees.tolist())
+        ]
+        self._record_trades(trades, pnls, fees)
+
+        self.event_log.extend(('close', t.symbol, t.exit_price, t.pnl, exit_time_ns) for t in trades)
+        if self.verbose:
+            logger.info("Closed %d positions, PnL: %.2f", n, pnls.sum())
+        return trades
         
+    @property
+    def closed_trades(self) -> List[Trade]:
+        """Closed trades in the order they were closed"""
+        return self._trades[:self._n_trades]
+
+    def trade_columns(self) -> Dict[str, np.ndarray]:
+        """Closed-trade fields as parallel arrays, one per column"""
+        trades = self.closed_trades
+        n = len(trades)
+        return {
+            'symbol': np.fromiter((t.symbol for t in trades), dtype=object, count=n),
+            'side': np.fromiter((t.side for t in trades), dtype=object, count=n),
+            'entry_price': np.fromiter((t.entry_price for t in trades), dtype=np.float64, count=n),
+            'exit_price': np.fromiter((t.exit_price for t in trades), dtype=np.float64, count=n),
+            'pnl': self._pnls[:n].copy(),
+            'exit_time': np.fromiter((t.exit_time_ns for t in trades), dtype=np.int64, count=n).view('datetime64[ns]')
+        }
+
+    def _reserve(self, n: int):
+        """Grow the trade buffers, doubling, until `n` more trades fit"""
+        capacity = len(self._pnls)
+        needed = self._n_trades + n
+        if needed <= capacity:
+            return
+
+        while capacity < needed:
+            capacity *= 2
+        self._trades.extend([None] * (capacity - len(self._trades)))
+        grown = np.empty((2, capacity))
+        grown[:, :self._n_trades] = self._trade_columns[:, :self._n_trades]
+        self._trade_columns = grown
+        self._pnls, self._fees = grown
+
+    def _record_trade(self, trade: Trade):
+        """Append a closed trade to the trade buffers, doubling them when full"""
+        if self._n_trades == len(self._pnls):
+            self._reserve(1)
+
+        pnl, fees = trade.pnl, trade.fees
+        self._trades[self._n_trades] = trade
+        self._pnls[self._n_trades] = pnl
+        self._fees[self._n_trades] = fees
+        self._n_trades += 1
+        self._gen += 1
+
+        self._total_pnl.add(pnl)
+        self._total_fees.add(fees)
+        if pnl > 0:
+            self._win_count += 1
+            self._total_profit.add(pnl)
+        elif pnl < 0:
+            self._loss_count += 1
+            self._total_loss.add(-pnl)
+
+    def _record_trades(self, trades: List[Trade], pnls: np.ndarray, fees: np.ndarray):
+        """Append a batch of closed trades to the trade buffers"""
+        self._reserve(len(pnls))
+        start, self._n_trades = self._n_trades, self._n_trades + len(pnls)
+        self._trades[start:self._n_trades] = trades
+        self._pnls[start:self._n_trades] = pnls
+        self._fees[start:self._n_trades] = fees
+        self._gen += 1
+
+        # Batch totals are summed exactly before joining the running sums
+        wins = pnls > 0
+        losses = pnls < 0
+        self._total_pnl.add(math.fsum(pnls.tolist()))
+        self._total_fees.add(math.fsum(fees.tolist()))
+        self._win_count += np.count_nonzero(wins)
+        self._loss_count += np.count_nonzero(losses)
+        self._total_profit.add(math.fsum(pnls[wins].tolist()))
+        self._total_loss.add(-math.fsum(pnls[losses].tolist()))
+
     def get_position(self, symbol: str) -> Optional[Position]:
         """Get current position for a symbol"""
         return self.open_positions.get(symbol)
         
     def get_pnl_summary(self) -> Dict:
         """Get summary of trading performance"""
-        total_pnl = sum(t.pnl for t in self.closed_trades)
-        total_fees = sum(t.fees for t in self.closed_trades)
-        win_trades = sum(1 for t in self.closed_trades if t.pnl > 0)
+        gen, summary = self._summary_memo
+        if gen != self._gen:
+            summary = self._compute_pnl_summary()
+            self._summary_memo = (self._gen, summary)
+        return dict(summary)
+
+    def _compute_pnl_summary(self) -> Dict:
+        total_pnl = self._total_pnl.value
+        total_fees = self._total_fees.value
+        win_trades = self._win_count
         
         return {
             'total_pnl': total_pnl,
             'total_fees': total_fees,
             'net_pnl': total_pnl - total_fees,
-            'total_trades': len(self.closed_trades),
+            'total_trades': self._n_trades,
             'win_trades': win_trades,
-            'win_rate': (win_trades / len(self.closed_trades) * 100) if self.closed_trades else 0,
+            'win_rate': (win_trades / self._n_trades * 100) if self._n_trades else 0,
             'roi': ((self.current_balance - self.initial_balance) / self.initial_balance * 100)
         }
 
     def calculate_metrics(self) -> Dict:
         """Calculate trading metrics"""
-        if not self.closed_trades:
+        gen, metrics = self._metrics_memo
+        if gen != self._gen:
+            metrics = self._compute_metrics()
+            self._metrics_memo = (self._gen, metrics)
+        return dict(metrics)
+
+    def _compute_metrics(self) -> Dict:
+        if not self._n_trades:
             return {
                 'total_trades': 0,
                 'win_rate': 0,
@@ -140,50 +419,30 @@ class PaperTrader:
                 'sharpe_ratio': 0
             }
             
-        # Calculate basic metrics
-        winning_trades = [t for t in self.closed_trades if t.pnl > 0]
-        losing_trades = [t for t in self.closed_trades if t.pnl < 0]
-        
-        total_profit = sum(t.pnl for t in winning_trades)
-        total_loss = abs(sum(t.pnl for t in losing_trades))
+        # Basic metrics come from the running aggregates
+        win_count = self._win_count
+        loss_count = self._loss_count
+        total_profit = self._total_profit.value
+        total_loss = self._total_loss.value
         
-        # Calculate running balance and drawdown
-        running_balance = [self.initial_balance]
-        for trade in self.closed_trades:
-            running_balance.append(running_balance[-1] + trade.pnl - trade.fees)
-            
-        peak_balance = self.initial_balance
-        max_drawdown = 0
-        
-        for balance in running_balance:
-            peak_balance = max(peak_balance, balance)
-            drawdown = (peak_balance - balance) / peak_balance * 100
-            max_drawdown = max(max_drawdown, drawdown)
+        # Drawdown and Sharpe ratio in one compiled pass over the trade columns
+        max_drawdown, sharpe_ratio = self._calculate_equity_stats()
         
         return {
-            'total_trades': len(self.closed_trades),
-            'win_rate': (len(winning_trades) / len(self.closed_trades)) * 100,
+            'total_trades': self._n_trades,
+            'win_rate': (win_count / self._n_trades) * 100,
             'profit_factor': total_profit / total_loss if total_loss > 0 else float('inf'),
-            'average_win': total_profit / len(winning_trades) if winning_trades else 0,
-            'average_loss': total_loss / len(losing_trades) if losing_trades else 0,
+            'average_win': total_profit / win_count if win_count else 0,
+            'average_loss': total_loss / loss_count if loss_count else 0,
             'max_drawdown': max_drawdown,
-            'sharpe_ratio': self._calculate_sharpe_ratio(running_balance)
+            'sharpe_ratio': sharpe_ratio
         }
         
-    def _calculate_sharpe_ratio(self, balance_history: List[float], risk_free_rate: float = 0.02) -> float:
-        """Calculate Sharpe ratio"""
-        if len(balance_history) < 2:
-            return 0
-            
-        returns = [(b2 - b1) / b1 for b1, b2 in zip(balance_history[:-1], balance_history[1:])]
-        if not returns:
-            return 0
-            
-        import numpy as np
-        returns_array = np.array(returns)
-        excess_returns = returns_array - (risk_free_rate / 252)  # Daily risk-free rate
-        
-        if len(excess_returns) < 2:
-            return 0
-            
-        return np.sqrt(252) * (excess_returns.mean() / excess_returns.std()) if excess_returns.std() != 0 else 0
\ No newline at end of file
+    def _calculate_equity_stats(self, risk_free_rate: float = 0.02) -> Tuple[float, float]:
+        """Calculate max drawdown percent and Sharpe ratio"""
+        n = self._n_trades
+        max_drawdown, sharpe_ratio = _equity_kernel(
+            self._pnls[:n], self._fees[:n], float(self.initial_balance),
+            risk_free_rate / TRADING_DAYS  # Daily risk-free rate
+        )
+        return float(max_drawdown), float(sharpe_ratio)
\ No newline at end of file
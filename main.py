@@ -7,5 +7,7 @@ if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
 if __name__ == "__main__":
-    # Run the Streamlit dashboard
-    os.system("streamlit run ui/dashboard.py")
\ No newline at end of file
+    # Run the Streamlit dashboard, replacing this process instead of
+    # spawning a shell that spawns streamlit
+    dashboard = os.path.join(ROOT_DIR, "ui", "dashboard.py")
+    os.execvp("streamlit", ["streamlit", "run", dashboard, *sys.argv[1:]])
\ No newline at end of file
@@ -0,0 +1,6 @@
+#!/usr/bin/env sh
+# Record a flame graph of the offline arbitrage benchmark (requires py-spy)
+set -e
+cd "$(dirname "$0")/.."
+mkdir -p .cache
+py-spy record -o .cache/profile.svg -- python perf/bench_arbitrage.py "$@"
@@ -0,0 +1,140 @@
+import unittest
+import numpy as np
+import pandas as pd
+from core.arbitrage import ArbitrageDetector
+
+class StubCollector:
+    """Minimal stand-in for ExchangeDataCollector serving fixed tickers"""
+    def __init__(self, prices, orderbooks=None, history=None):
+        self.prices = prices
+        self.orderbooks = orderbooks or {}
+        self.history = history or {}
+        self.subscriptions = set()
+
+    def subscribe(self, symbol, exchange_id):
+        self.subscriptions.add((exchange_id, symbol))
+        return True
+
+    def get_ticker(self, symbol, exchange_id):
+        price = self.prices.get(exchange_id)
+        if price is None:
+            return None
+        return {'symbol': symbol, 'last': price}
+
+    def get_tickers_bulk(self, symbols, exchange_id):
+        tickers = {s: self.get_ticker(s, exchange_id) for s in symbols}
+        return {s: t for s, t in tickers.items() if t}
+
+    def get_orderbook(self, symbol, exchange_id, limit=20):
+        return self.orderbooks.get(exchange_id)
+
+    def get_historical_data(self, symbol, exchange_id, timeframe='5m', days=5):
+        return self.history.get(exchange_id, pd.DataFrame())
+
+class TestArbitrageDetector(unittest.TestCase):
+    def setUp(self):
+        """Set up detector with a spread between three exchanges"""
+        self.prices = {'binance': 100.0, 'kucoin': 101.0, 'okx': 100.5}
+        self.detector = ArbitrageDetector(StubCollector(self.prices))
+
+    def test_find_opportunities(self):
+        """Test pairwise opportunity detection and ordering"""
+        opportunities = self.detector.find_opportunities('BTC/USDT', list(self.prices))
+
+        # Only buy-low/sell-high pairs clearing fees are reported
+        pairs = [(o['buy_exchange'], o['sell_exchange']) for o in opportunities]
+        self.assertEqual(pairs, [('binance', 'kucoin'), ('binance', 'okx'), ('okx', 'kucoin')])
+
+        best = opportunities[0]
+        self.assertAlmostEqual(best['spread_percent'], 1.0)
+        self.assertAlmostEqual(best['potential_profit_percent'], 1.0 - 0.201)
+        self.assertEqual(best['buy_price'], 100.0)
+        self.assertEqual(best['sell_price'], 101.0)
+
+        # Scanned quotes are kept streaming for the next scan
+        self.assertEqual(self.detector.data_collector.subscriptions,
+                         {(exchange, 'BTC/USDT') for exchange in self.prices})
+
+    def test_find_opportunities_array(self):
+        """Test structured array output matches the dict records"""
+        records = self.detector.find_opportunities('BTC/USDT', list(self.prices))
+        opportunities = self.detector.find_opportunities_array('BTC/USDT', list(self.prices))
+
+        self.assertEqual(len(opportunities), len(records))
+        self.assertEqual(opportunities['buy_exchange'].tolist(), [r['buy_exchange'] for r in records])
+        self.assertTrue((np.diff(opportunities['potential_profit_percent']) <= 0).all())
+        self.assertIsInstance(records[0]['buy_exchange'], str)
+        self.assertIsInstance(records[0]['spread_percent'], float)
+
+    def test_find_opportunities_batch(self):
+        """Test the multi-symbol scan matches per-symbol results"""
+        symbols = ['BTC/USDT', 'ETH/USDT']
+        batch = self.detector.find_opportunities_batch(symbols, list(self.prices) + ['bybit'])
+
+        single = self.detector.find_opportunities('BTC/USDT', list(self.prices))
+        self.assertEqual(len(batch), 2 * len(single))
+        self.assertEqual({o['symbol'] for o in batch}, set(symbols))
+        for opp in single:
+            matches = [o for o in batch if o['symbol'] == 'BTC/USDT' and
+                       o['buy_exchange'] == opp['buy_exchange'] and o['sell_exchange'] == opp['sell_exchange']]
+            self.assertEqual(len(matches), 1)
+            self.assertAlmostEqual(matches[0]['potential_profit_percent'], opp['potential_profit_percent'])
+
+        profits = [o['potential_profit_percent'] for o in batch]
+        self.assertEqual(profits, sorted(profits, reverse=True))
+
+    def test_find_opportunities_edge_cases(self):
+        """Test missing tickers and flat prices"""
+        self.assertEqual(self.detector.find_opportunities('BTC/USDT', ['binance', 'bybit']), [])
+
+        flat = ArbitrageDetector(StubCollector({'binance': 100.0, 'kucoin': 100.0}))
+        self.assertEqual(flat.find_opportunities('BTC/USDT', ['binance', 'kucoin']), [])
+
+    def test_best_execution_path(self):
+        """Test orderbook walk with slippage and liquidity shortfall"""
+        orderbooks = {
+            'binance': {'asks': [[100.0, 1.0], [101.0, 1.0]], 'bids': [[99.0, 2.0]]},
+            'kucoin': {'asks': [[104.0, 2.0]], 'bids': [[103.0, 1.0], [102.0, 1.0]]},
+            'okx': {'asks': [[90.0, 0.5]], 'bids': [[110.0, 0.5]]}
+        }
+        detector = ArbitrageDetector(StubCollector(self.prices, orderbooks))
+
+        self.assertAlmostEqual(detector._calculate_effective_price(orderbooks['binance']['asks'], 2.0), 100.5)
+        self.assertIsNone(detector._calculate_effective_price(orderbooks['okx']['asks'], 2.0))
+        self.assertIsNone(detector._calculate_effective_price([], 1.0))
+
+        path = detector.get_best_execution_path('BTC/USDT', list(orderbooks), 2.0)
+        self.assertEqual(path['buy_exchange'], 'binance')
+        self.assertEqual(path['sell_exchange'], 'kucoin')
+        self.assertAlmostEqual(path['execution_details']['sell_price'], 102.5)
+        self.assertAlmostEqual(path['expected_profit'], 4.0 - 0.406)
+
+    def test_close(self):
+        """Test closing a detector shuts down its fetch pool"""
+        detector = ArbitrageDetector(StubCollector(self.prices))
+        detector.find_opportunities('BTC/USDT', list(self.prices))
+        detector.close()
+        with self.assertRaises(RuntimeError):
+            detector.executor.submit(int)
+
+    def test_historical_spreads(self):
+        """Test spread alignment across exchanges with missing bars"""
+        index = pd.date_range(start='2024-01-01', periods=4, freq='5min')
+        history = {
+            'binance': pd.DataFrame({'close': [100.0, 100.0, 100.0, 100.0]}, index=index),
+            'kucoin': pd.DataFrame({'close': [101.0, 99.0, 102.0]}, index=index[:3]),
+            'okx': pd.DataFrame({'close': [100.5, 100.5]}, index=index[[0, 3]])
+        }
+        detector = ArbitrageDetector(StubCollector(self.prices, history=history))
+
+        spreads = detector.get_historical_spreads('BTC/USDT', list(history))
+        self.assertEqual(list(spreads.columns), ['binance-kucoin', 'binance-okx', 'kucoin-okx'])
+        self.assertEqual(len(spreads), 4)
+        self.assertEqual(spreads['binance-kucoin'].tolist()[:3], [1.0, -1.0, 2.0])
+        self.assertTrue(pd.isna(spreads['binance-kucoin'].iloc[3]))
+        self.assertAlmostEqual(spreads['binance-okx'].iloc[3], 0.5)
+
+        self.assertTrue(detector.get_historical_spreads('BTC/USDT', ['binance']).empty)
+
+if __name__ == '__main__':
+    unittest.main()
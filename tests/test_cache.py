@@ -0,0 +1,108 @@
+import unittest
+import threading
+import time
+import importlib.util
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from utils.cache import DiskFrameCache, TTLCache, TieredCache, LOCK_STRIPES, dumps_frame, loads_frame
+
+class TestTTLCache(unittest.TestCase):
+    def test_expiry(self):
+        """Test entries expire after the time-to-live"""
+        cache = TTLCache(maxsize=10, ttl=0.05)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('a'))
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+class TestTieredCache(unittest.TestCase):
+    def test_get_or_set(self):
+        """Test hits skip the computation and None results are not cached"""
+        cache = TieredCache('test', ttl=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'last': 100.0}
+
+        self.assertEqual(cache.get_or_set('k', compute), {'last': 100.0})
+        self.assertEqual(cache.get_or_set('k', compute), {'last': 100.0})
+        self.assertEqual(len(calls), 1)
+
+        self.assertIsNone(cache.get_or_set('missing', lambda: None))
+        self.assertIsNone(cache.get('missing'))
+
+    def test_concurrent_misses_coalesce(self):
+        """Test concurrent misses on one key compute only once"""
+        cache = TieredCache('test', ttl=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return 42
+
+        threads = [threading.Thread(target=cache.get_or_set, args=('k', compute)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get('k'), 42)
+
+    def test_default_codec(self):
+        """Test Redis payloads default to JSON and keys share a bounded lock pool"""
+        cache = TieredCache('test', ttl=60)
+        ticker = {'symbol': 'BTC/USDT', 'last': 100.5, 'bid': None, 'info': {'ts': 1}}
+        payload = cache.dumps(ticker)
+        self.assertEqual(payload, b'{"symbol":"BTC/USDT","last":100.5,"bid":null,"info":{"ts":1}}')
+        self.assertEqual(cache.loads(payload), ticker)
+
+        for i in range(1000):
+            cache.get_or_set(f'k{i}', lambda: 1)
+        self.assertEqual(len(cache._locks), LOCK_STRIPES)
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), "pyarrow not installed")
+    def test_frame_serialization(self):
+        """Test DataFrames survive the Arrow IPC round trip used for Redis"""
+        index = pd.date_range(start='2024-01-01', periods=3, freq='5min', name='timestamp')
+        df = pd.DataFrame({'close': [1.0, np.nan, 3.0], 'volume': [10.0, 11.0, 12.0]}, index=index)
+
+        restored = loads_frame(dumps_frame(df))
+        pd.testing.assert_frame_equal(restored, df, check_freq=False)
+
+@unittest.skipUnless(importlib.util.find_spec('pyarrow'), "pyarrow not installed")
+class TestDiskFrameCache(unittest.TestCase):
+    def test_round_trip_and_expiry(self):
+        """Test frames are read back from disk until their files age past the TTL"""
+        index = pd.date_range(start='2024-01-01', periods=3, freq='5min')
+        df = pd.DataFrame({'binance-kucoin': np.array([0.1, np.nan, -0.2], dtype=np.float32)}, index=index)
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskFrameCache(os.path.join(directory, 'spreads'), ttl=60)
+            self.assertIsNone(cache.get('BTC/USDT_binance-kucoin'))
+
+            cache.set('BTC/USDT_binance-kucoin', df)
+            pd.testing.assert_frame_equal(cache.get('BTC/USDT_binance-kucoin'), df, check_freq=False)
+            self.assertEqual(os.listdir(cache.directory), ['BTC_USDT_binance-kucoin.parquet'])
+
+            stale = time.time() - 120
+            os.utime(cache._path('BTC/USDT_binance-kucoin'), (stale, stale))
+            self.assertIsNone(cache.get('BTC/USDT_binance-kucoin'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+from core.data import ExchangeDataCollector
+
+class FakeExchange:
+    """Minimal ccxt-like client recording the calls it receives"""
+    def __init__(self, has_bulk=True):
+        self.has = {'fetchTickers': has_bulk}
+        self.calls = []
+
+    def fetch_ticker(self, symbol):
+        self.calls.append(('fetch_ticker', symbol))
+        return {'symbol': symbol, 'last': 100.0}
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        self.calls.append(('fetch_ohlcv', symbol))
+        return [
+            [1704067200000, 100.0, 101.0, 99.0, 100.5, 10],
+            [1704067500000, 100.5, 102.0, 100.0, None, 12]
+        ]
+
+    def fetch_tickers(self, symbols):
+        self.calls.append(('fetch_tickers', tuple(symbols)))
+        return {s: {'symbol': s, 'last': 100.0} for s in symbols if s != 'BAD/USDT'}
+
+    def fetch_order_book(self, symbol, limit=None):
+        self.calls.append(('fetch_order_book', symbol))
+        return {'asks': [[101.0, 1.0]], 'bids': [[99.0, 1.0]], 'timestamp': None}
+
+class FakeStreamExchange:
+    """Minimal ccxt.pro-like client that pushes one update per stream, then stalls"""
+    has = {'watchTicker': True, 'watchOrderBook': True}
+
+    def __init__(self):
+        self.pushed = set()
+        self.closed = False
+
+    async def _push_once(self, stream, value):
+        if stream in self.pushed:
+            await asyncio.Event().wait()
+        self.pushed.add(stream)
+        return value
+
+    async def watch_ticker(self, symbol):
+        return await self._push_once(('ticker', symbol), {'symbol': symbol, 'last': 200.0})
+
+    async def watch_order_book(self, symbol):
+        levels = [[200.0 + i, 1.0, 0] for i in range(5)]
+        return await self._push_once(('book', symbol), {'asks': levels, 'bids': levels, 'timestamp': 1})
+
+    async def close(self):
+        self.closed = True
+
+class TestExchangeDataCollector(unittest.TestCase):
+    def setUp(self):
+        """Set up a collector with a fake exchange client"""
+        self.collector = ExchangeDataCollector()
+        self.exchange = FakeExchange()
+        self.collector.exchanges['fake'] = self.exchange
+
+    def test_ticker_cache(self):
+        """Test repeated ticker requests are served from cache"""
+        self.collector.get_ticker('BTC/USDT', 'fake')
+        self.collector.get_ticker('BTC/USDT', 'fake')
+        self.assertEqual(self.exchange.calls, [('fetch_ticker', 'BTC/USDT')])
+
+    def test_historical_data(self):
+        """Test OHLCV rows convert to a float64 frame indexed by timestamp"""
+        df = self.collector.get_historical_data('BTC/USDT', 'fake')
+
+        self.assertEqual(list(df.columns), ['open', 'high', 'low', 'close', 'volume'])
+        self.assertTrue((df.dtypes == 'float64').all())
+        self.assertEqual(df.index.name, 'timestamp')
+        self.assertEqual(str(df.index[1]), '2024-01-01 00:05:00')
+        self.assertTrue(df['close'].isna().iloc[1])
+
+        self.collector.get_historical_data('BTC/USDT', 'fake')
+        self.assertEqual(self.exchange.calls, [('fetch_ohlcv', 'BTC/USDT')])
+
+    def test_get_tickers_bulk(self):
+        """Test bulk fetch uses one request and seeds the ticker cache"""
+        self.collector.get_ticker('BTC/USDT', 'fake')
+        tickers = self.collector.get_tickers_bulk(['BTC/USDT', 'ETH/USDT', 'BAD/USDT'], 'fake')
+
+        self.assertEqual(sorted(tickers), ['BTC/USDT', 'ETH/USDT'])
+        self.assertEqual(self.exchange.calls[-1], ('fetch_tickers', ('ETH/USDT', 'BAD/USDT')))
+
+        self.collector.get_ticker('ETH/USDT', 'fake')
+        self.assertEqual(len(self.exchange.calls), 2)
+
+    def test_get_tickers_bulk_fallback(self):
+        """Test exchanges without a bulk endpoint fall back to per-symbol fetches"""
+        exchange = FakeExchange(has_bulk=False)
+        self.collector.exchanges['slow'] = exchange
+
+        tickers = self.collector.get_tickers_bulk(['BTC/USDT', 'ETH/USDT'], 'slow')
+        self.assertEqual(sorted(tickers), ['BTC/USDT', 'ETH/USDT'])
+        self.assertEqual([c[0] for c in exchange.calls], ['fetch_ticker', 'fetch_ticker'])
+
+    def test_shared_session(self):
+        """Test every exchange client reuses the collector's HTTP session"""
+        binance = self.collector._get_exchange('binance')
+        kucoin = self.collector._get_exchange('kucoin')
+        self.assertIs(binance.session, self.collector.session)
+        self.assertIs(kucoin.session, self.collector.session)
+
+    def test_streams(self):
+        """Test streamed tickers and books are served from memory until they expire"""
+        stream_exchange = FakeStreamExchange()
+        self.collector.stream_exchanges['fake'] = stream_exchange
+        self.collector.ticker_cache.local.ttl = 0.2
+        self.collector.orderbook_cache.ttl = 0.2
+        self.addCleanup(self.collector.close)
+
+        self.assertTrue(self.collector.subscribe('BTC/USDT', 'fake'))
+        deadline = time.monotonic() + 2
+        while len(stream_exchange.pushed) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self.collector.get_ticker('BTC/USDT', 'fake')['last'], 200.0)
+        orderbook = self.collector.get_orderbook('BTC/USDT', 'fake', limit=3)
+        self.assertEqual(orderbook['asks'], [[200.0, 1.0], [201.0, 1.0], [202.0, 1.0]])
+        self.assertEqual(self.exchange.calls, [])
+
+        # The stream has stalled: once the pushes expire, REST takes over
+        time.sleep(0.25)
+        self.assertEqual(self.collector.get_ticker('BTC/USDT', 'fake')['last'], 100.0)
+        self.assertEqual(self.collector.get_orderbook('BTC/USDT', 'fake')['asks'], [[101.0, 1.0]])
+        self.assertEqual([c[0] for c in self.exchange.calls], ['fetch_ticker', 'fetch_order_book'])
+
+        # Past the stream limit the least recently requested symbol is dropped
+        with mock.patch('core.data.MAX_STREAMS', 1):
+            self.collector.subscribe('ETH/USDT', 'fake')
+        self.assertEqual(list(self.collector.streams), [('fake', 'ETH/USDT')])
+
+        # The client is closed with its last stream, and close() stops the loop
+        thread = self.collector._stream_thread
+        self.collector.unsubscribe('ETH/USDT', 'fake')
+        self.collector.close()
+        self.assertTrue(stream_exchange.closed)
+        self.assertFalse(self.collector.stream_exchanges)
+        self.assertFalse(thread.is_alive())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+import pandas as pd
+from utils.downsample import lttb, downsample_ohlcv, resample_ohlcv
+
+class TestDownsample(unittest.TestCase):
+    def setUp(self):
+        """Set up a minute series with a single spike"""
+        index = pd.date_range(start='2024-01-01', periods=1000, freq='1min')
+        close = np.full(1000, 100.0)
+        close[500] = 150.0
+        self.df = pd.DataFrame({
+            'open': close, 'high': close + 1, 'low': close - 1,
+            'close': close, 'volume': np.ones(1000)
+        }, index=index)
+
+    def test_lttb(self):
+        """Test LTTB keeps the endpoints and the spike"""
+        sampled = lttb(self.df['close'], 50)
+        self.assertEqual(len(sampled), 50)
+        self.assertEqual(sampled.index[0], self.df.index[0])
+        self.assertEqual(sampled.index[-1], self.df.index[-1])
+        self.assertEqual(sampled.max(), 150.0)
+        self.assertTrue(sampled.index.is_monotonic_increasing)
+
+        close = self.df['close']
+        self.assertIs(lttb(close, 5000), close)
+
+        # Positional series such as an equity curve sample by bar number
+        equity = lttb(pd.Series(close.to_numpy()), 50)
+        self.assertEqual(equity.index[-1], 999)
+        self.assertEqual(equity.max(), 150.0)
+
+    def test_downsample_ohlcv(self):
+        """Test merged bars keep extremes, boundary prices and total volume"""
+        bars = downsample_ohlcv(self.df, 100)
+        self.assertEqual(len(bars), 100)
+        self.assertEqual(bars['high'].max(), 151.0)
+        self.assertEqual(bars['low'].min(), 99.0)
+        self.assertEqual(bars['volume'].sum(), 1000.0)
+        self.assertEqual(bars['open'].iloc[0], self.df['open'].iloc[0])
+        self.assertEqual(bars['close'].iloc[-1], self.df['close'].iloc[-1])
+
+        self.assertIs(downsample_ohlcv(self.df, 5000), self.df)
+
+    def test_resample_ohlcv(self):
+        """Test resampling picks a whole multiple of the bar spacing"""
+        df = self.df.assign(ema_8=np.arange(1000.0))
+        bars = resample_ohlcv(df, 300)
+        self.assertLessEqual(len(bars), 300)
+        self.assertEqual(bars.index[1] - bars.index[0], pd.Timedelta(minutes=4))
+        self.assertEqual(bars['high'].max(), 151.0)
+        self.assertEqual(bars['volume'].sum(), 1000.0)
+        self.assertEqual(bars['ema_8'].iloc[0], 3.0)
+
+        self.assertIs(resample_ohlcv(df, 5000), df)
+
+        # Exchange timestamps parsed from milliseconds keep their own resolution
+        ms = pd.Timestamp('2024-01-01').value // 10**6 + np.arange(1440) * 60_000
+        index = pd.to_datetime(ms, unit='ms').as_unit('ms')
+        minute_bars = pd.DataFrame({col: np.ones(1440) for col in ('open', 'high', 'low', 'close', 'volume')}, index=index)
+        bars = resample_ohlcv(minute_bars, 800)
+        self.assertEqual(len(bars), 720)
+        self.assertEqual(bars.index[1] - bars.index[0], pd.Timedelta(minutes=2))
+        self.assertEqual(bars['volume'].sum(), 1440.0)
+
+if __name__ == '__main__':
+    unittest.main()
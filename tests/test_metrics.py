@@ -0,0 +1,93 @@
+import unittest
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+from utils.metrics import MarketMetrics
+
+class TestMarketMetrics(unittest.TestCase):
+    def setUp(self):
+        """Set up a random-walk OHLCV frame"""
+        rng = np.random.default_rng(3)
+        close = 100 + np.cumsum(rng.normal(size=300))
+        self.df = pd.DataFrame({
+            'open': close,
+            'high': close + rng.random(300),
+            'low': close - rng.random(300),
+            'close': close,
+            'volume': rng.random(300) * 1000
+        }, index=pd.date_range(start='2024-01-01', periods=300, freq='1min'))
+
+    def test_calculate_indicators(self):
+        """Test compiled indicators match pandas_ta"""
+        df = MarketMetrics.calculate_indicators(self.df.copy())
+        close = self.df['close']
+        macd = ta.macd(close)
+        expected = {
+            'sma_20': ta.sma(close, length=20),
+            'sma_200': ta.sma(close, length=200),
+            'ema_8': ta.ema(close, length=8),
+            'ema_55': ta.ema(close, length=55),
+            'rsi': ta.rsi(close, length=14),
+            'macd_line': macd['MACD_12_26_9'],
+            'macd_signal': macd['MACDs_12_26_9'],
+            'macd_hist': macd['MACDh_12_26_9'],
+            'atr': ta.atr(self.df['high'], self.df['low'], close, length=14)
+        }
+        for col, values in expected.items():
+            np.testing.assert_allclose(df[col].to_numpy(), values.to_numpy(), rtol=1e-12, atol=1e-10, err_msg=col)
+
+        # A gap in the closes is carried through like pandas ewm
+        gapped = self.df.copy()
+        gapped.iloc[100:103, gapped.columns.get_loc('close')] = np.nan
+        df = MarketMetrics.calculate_indicators(gapped)
+        np.testing.assert_allclose(df['ema_21'].to_numpy(), ta.ema(gapped['close'], length=21).to_numpy(), rtol=1e-12)
+        np.testing.assert_allclose(df['sma_50'].to_numpy(), ta.sma(gapped['close'], length=50).to_numpy(), rtol=1e-12)
+
+        # Too short for the slow windows: NaN instead of missing columns
+        short = MarketMetrics.calculate_indicators(self.df.iloc[:20].copy())
+        self.assertTrue(short['macd_line'].isna().all())
+        self.assertTrue(short['rsi'].notna().any())
+        self.assertTrue(short['sma_200'].isna().all())
+
+    def test_calculate_metrics(self):
+        """Test 24-bar metrics against pandas tail reductions"""
+        metrics = MarketMetrics.calculate_metrics(self.df)
+        close = self.df['close']
+        self.assertEqual(metrics['last_price'], close.iloc[-1])
+        self.assertAlmostEqual(metrics['price_change_24h'], (close.iloc[-1] / close.iloc[-24] - 1) * 100)
+        self.assertEqual(metrics['high_24h'], self.df['high'].tail(24).max())
+        self.assertEqual(metrics['low_24h'], self.df['low'].tail(24).min())
+        self.assertAlmostEqual(metrics['volume_24h'], self.df['volume'].tail(24).sum())
+        self.assertAlmostEqual(metrics['volatility_24h'], close.pct_change().tail(24).std() * 100)
+
+        summary = MarketMetrics.get_summary_metrics(MarketMetrics.calculate_indicators(self.df.copy()))
+        self.assertIn(summary['signal'], ('buy', 'sell'))
+
+    def test_calculate_arbitrage_metrics(self):
+        """Test pairwise spreads and opportunities ordered by spread"""
+        result = MarketMetrics.calculate_arbitrage_metrics({'binance': 100.0, 'kucoin': 101.0, 'okx': 99.2})
+        self.assertAlmostEqual(result['spreads']['binance']['kucoin'], 1.0)
+        self.assertAlmostEqual(result['spreads']['kucoin']['okx'], (99.2 - 101.0) / 101.0 * 100)
+        self.assertEqual(result['spreads']['okx'], {})
+
+        opportunities = result['opportunities']
+        self.assertEqual([(o['buy_exchange'], o['sell_exchange']) for o in opportunities],
+                         [('okx', 'kucoin'), ('binance', 'kucoin'), ('okx', 'binance')])
+        self.assertAlmostEqual(opportunities[0]['spread'], 1.8 / 101.0 * 100)
+
+        self.assertEqual(MarketMetrics.calculate_arbitrage_metrics({'binance': 100.0})['opportunities'], [])
+
+    def test_analyze_volume_profile(self):
+        """Test the volume histogram, point of control and value area"""
+        profile = MarketMetrics.analyze_volume_profile(self.df, price_levels=20)
+        self.assertEqual(len(profile['volume_profile']), 20)
+        self.assertAlmostEqual(sum(profile['volume_profile'].values()), self.df['volume'].sum())
+
+        poc = profile['point_of_control']
+        self.assertEqual(poc['volume'], max(profile['volume_profile'].values()))
+        self.assertEqual(profile['volume_profile'][poc['price']], poc['volume'])
+        self.assertLessEqual(profile['value_area']['low'], poc['price'])
+        self.assertGreaterEqual(profile['value_area']['high'], poc['price'])
+
+if __name__ == '__main__':
+    unittest.main()
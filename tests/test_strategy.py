@@ -2,25 +2,27 @@ import unittest
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from core.strategy import Strategy
+from core.strategy import Strategy, _backtest_core
 
 class TestStrategy(unittest.TestCase):
-    def setUp(self):
-        """Set up test data"""
-        # Create sample OHLCV data
+    @classmethod
+    def setUpClass(cls):
+        """Set up test data shared by every test"""
+        # Create sample OHLCV data from a fixed seed
         dates = pd.date_range(start='2024-01-01', periods=100, freq='1H')
-        self.test_data = pd.DataFrame({
-            'open': np.random.normal(100, 2, 100),
-            'high': np.random.normal(102, 2, 100),
-            'low': np.random.normal(98, 2, 100),
-            'close': np.random.normal(101, 2, 100),
-            'volume': np.random.normal(1000, 200, 100)
-        }, index=dates)
+        data = np.random.default_rng(0).normal(
+            loc=[100, 102, 98, 101, 1000], scale=[2, 2, 2, 2, 200], size=(100, 5)
+        )
         
         # Ensure high is highest and low is lowest
-        self.test_data['high'] = self.test_data[['open', 'high', 'low', 'close']].max(axis=1)
-        self.test_data['low'] = self.test_data[['open', 'high', 'low', 'close']].min(axis=1)
-        
+        prices = data[:, :4]
+        high, low = prices.max(axis=1), prices.min(axis=1)
+        data[:, 1], data[:, 2] = high, low
+
+        cls.test_data = pd.DataFrame(data, columns=['open', 'high', 'low', 'close', 'volume'], index=dates)
+
+    def setUp(self):
+        """Set up a fresh strategy so indicator caches do not leak between tests"""
         self.strategy = Strategy()
 
     def test_calculate_indicators(self):
@@ -39,6 +41,39 @@ class TestStrategy(unittest.TestCase):
             self.assertIn(col, df.columns)
             self.assertTrue(df[col].notna().any())
 
+        # Windows longer than the series fall back to close on their own
+        self.assertFalse((df['rsi'] == 50).all())
+        self.assertTrue((df['sma_200'] == df['close']).all())
+
+        # Too short for MACD: neutral defaults everywhere
+        short = self.strategy.calculate_indicators(self.test_data.iloc[:20])
+        self.assertTrue((short['rsi'] == 50).all())
+        self.assertTrue((short['macd_line'] == 0).all())
+
+        # Both paths add the same indicator set, so cached entries are interchangeable
+        self.assertEqual(list(df.columns[len(self.test_data.columns):]), expected_columns)
+        self.assertEqual(list(short.columns[len(self.test_data.columns):]), expected_columns)
+
+    def test_indicator_cache(self):
+        """Test indicators are reused for identical bars and recomputed otherwise"""
+        first = self.strategy.calculate_indicators(self.test_data)
+        second = self.strategy.calculate_indicators(self.test_data.copy())
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(len(self.strategy._indicator_cache), 1)
+
+        # Cached columns are not shared with returned frames
+        second['rsi'] = -1.0
+        self.assertTrue((self.strategy.calculate_indicators(self.test_data)['rsi'] >= 0).all())
+
+        changed = self.test_data.copy()
+        changed.loc[changed.index[50], 'close'] += 1
+        self.strategy.calculate_indicators(changed)
+        self.assertEqual(len(self.strategy._indicator_cache), 2)
+
+        for k in range(self.strategy.indicator_cache_size):
+            self.strategy.calculate_indicators(self.test_data.iloc[k:])
+        self.assertEqual(len(self.strategy._indicator_cache), self.strategy.indicator_cache_size)
+
     def test_generate_signals(self):
         """Test trading signal generation"""
         df = self.strategy.generate_signals(self.test_data.copy())
@@ -70,6 +105,11 @@ class TestStrategy(unittest.TestCase):
         for key in expected_keys:
             self.assertIn(key, results)
         
+        # Structured records mirror the trade dicts
+        records = results['trade_records']
+        self.assertEqual(len(records), results['total_trades'])
+        self.assertEqual(records['pnl'].tolist(), [t['pnl'] for t in results['trades']])
+
         # Check if equity curve is valid
         self.assertEqual(len(results['equity_curve']), len(self.test_data))
         self.assertGreater(len(results['equity_curve']), 0)
@@ -81,6 +121,60 @@ class TestStrategy(unittest.TestCase):
         self.assertGreaterEqual(results['max_drawdown'], 0)
         self.assertLessEqual(results['max_drawdown'], 100)
 
+    def test_backtest_core(self):
+        """Test stop/take-profit exits and end-of-data close on fixed bars"""
+        high = np.array([101.0, 101.0, 104.0, 101.0, 99.5, 99.5])
+        low = np.array([99.0, 99.0, 100.0, 97.0, 98.0, 95.5])
+        close = np.array([100.0, 100.0, 103.0, 98.0, 99.0, 96.0])
+        atr = np.ones(6)
+        signal = np.array([0.0, 1.0, 0.0, -1.0, 0.0, 0.0])
+
+        equity, entry_idx, exit_idx, sides, entry_px, exit_px, pnls, balances = _backtest_core(
+            high, low, close, atr, signal, 10000.0, 2.0, 3.0, 0.02)
+
+        # Long at 100 takes profit at 103, short at 98 runs to the final close
+        self.assertEqual(entry_idx.tolist(), [1, 3])
+        self.assertEqual(exit_idx.tolist(), [2, 5])
+        self.assertEqual(sides.tolist(), [1, -1])
+        self.assertEqual(exit_px.tolist(), [103.0, 96.0])
+        self.assertAlmostEqual(pnls[0], 3.0 * 100)
+        self.assertAlmostEqual(pnls[1], 2.0 * 10300 * 0.02 / 2.0)
+        self.assertAlmostEqual(equity[-1], balances[-1])
+        self.assertEqual(equity[0], 10000.0)
+
+    def test_backtest_many(self):
+        """Test multi-symbol batch matches per-symbol backtests"""
+        frames = {
+            'BTC/USDT': self.test_data,
+            'ETH/USDT': self.test_data.iloc[:60] * 1.5,
+            'SOL/USDT': self.test_data.iloc[:0]
+        }
+        results = self.strategy.backtest_many(frames)
+        self.assertEqual(list(results), list(frames))
+
+        for symbol, df in frames.items():
+            expected = self.strategy.backtest(df)
+            self.assertEqual(results[symbol]['equity_curve'], expected['equity_curve'])
+            for key in ['total_return', 'win_rate', 'total_trades', 'max_drawdown']:
+                self.assertAlmostEqual(results[symbol][key], expected[key])
+
+    def test_sweep(self):
+        """Test parameter sweep matches individual backtests"""
+        grid = [{}, {'stop_loss_atr': 1.0, 'take_profit_atr': 1.5}, {'risk_per_trade': 0.01}]
+        results = self.strategy.sweep(self.test_data, grid)
+        self.assertEqual(len(results), len(grid))
+
+        for params, result in zip(grid, results):
+            strategy = Strategy()
+            strategy.stop_loss_atr = params.get('stop_loss_atr', strategy.stop_loss_atr)
+            strategy.take_profit_atr = params.get('take_profit_atr', strategy.take_profit_atr)
+            expected = strategy.backtest(self.test_data, risk_per_trade=params.get('risk_per_trade', 0.02))
+            for key in ['total_return', 'win_rate', 'total_trades', 'max_drawdown']:
+                self.assertAlmostEqual(result[key], expected[key])
+
+        empty = pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'])
+        self.assertEqual(self.strategy.sweep(empty, grid)[0]['total_trades'], 0)
+
     def test_risk_management(self):
         """Test risk management rules"""
         initial_balance = 10000
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from utils.symbol_manager import SymbolManager
+
+class FakeExchange:
+    """Minimal ccxt-like client serving a fixed set of markets"""
+    def __init__(self, pairs):
+        self.markets = {
+            f"{base}/{quote}": {'base': base, 'quote': quote, 'info': {}}
+            for base, quote in pairs
+        }
+        self.loads = 0
+
+    def load_markets(self, reload=False):
+        self.loads += 1
+        return self.markets
+
+class OfflineSymbolManager(SymbolManager):
+    """Symbol manager with a fixed top-coins list instead of CoinGecko"""
+    def _load_top_coins(self):
+        self.top_coins_cache = {
+            'BTC': {'symbol': 'btc', 'market_cap': 2},
+            'ETH': {'symbol': 'eth', 'market_cap': 1},
+            'SOL': {'symbol': 'sol', 'market_cap': None}
+        }
+        self._index_top_coins()
+
+class TestSymbolManager(unittest.TestCase):
+    def setUp(self):
+        """Set up a manager with two fake exchanges"""
+        self.manager = OfflineSymbolManager()
+        self.binance = FakeExchange([('BTC', 'USDT'), ('ETH', 'USDT'), ('DOGE', 'USDT'), ('SOL', 'USDT'), ('ETH', 'BTC')])
+        self.kucoin = FakeExchange([('BTC', 'USDT'), ('ETH', 'USDT'), ('DOGE', 'USDT'), ('SOL', 'USDT'), ('ETH', 'BTC')])
+        self.manager.exchanges.update(binance=self.binance, kucoin=self.kucoin)
+
+    def test_common_symbols(self):
+        """Test symbols are intersected across exchanges and ranked by market cap"""
+        symbols = self.manager.get_common_symbols(['binance', 'kucoin'], 'USDT', top_coins_only=True)
+        self.assertEqual(symbols, ['BTC/USDT', 'ETH/USDT', 'SOL/USDT'])
+        symbols = self.manager.get_common_symbols(['binance', 'kucoin'], 'USDT')
+        self.assertEqual(symbols[:2], ['BTC/USDT', 'ETH/USDT'])
+        self.assertEqual(sorted(symbols[2:]), ['DOGE/USDT', 'SOL/USDT'])
+        self.assertEqual(self.manager.get_common_symbols(['binance', 'kucoin'], 'BTC'), ['ETH/BTC'])
+
+        # One market download per exchange serves every quote currency
+        self.assertEqual((self.binance.loads, self.kucoin.loads), (1, 1))
+
+        self.manager.exchanges['empty'] = FakeExchange([])
+        self.assertEqual(self.manager.get_common_symbols(['binance', 'empty', 'kucoin'], 'USDT'), [])
+
+    def test_exchange_symbols_by_volume(self):
+        """Test symbols are ordered by the quote volume their markets report"""
+        self.binance.markets['ETH/USDT']['info'] = {'quoteVolume': '5000'}
+        self.binance.markets['DOGE/USDT']['info'] = {'quoteVolume': '100'}
+        symbols = self.manager.get_exchange_symbols('binance', 'USDT')
+        self.assertEqual(symbols, ['ETH/USDT', 'DOGE/USDT', 'BTC/USDT', 'SOL/USDT'])
+
+    def test_close(self):
+        """Test closing a manager shuts down its download pool"""
+        self.manager.get_common_symbols(['binance', 'kucoin'], 'USDT')
+        self.manager.close()
+        with self.assertRaises(RuntimeError):
+            self.manager.executor.submit(int)
+
+    def test_persisted_symbols(self):
+        """Test symbol lists survive a restart through the JSON cache file"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'symbols.json')
+            manager = OfflineSymbolManager(cache_path=path)
+            manager.exchanges['binance'] = self.binance
+            symbols = manager.get_exchange_symbols('binance', 'USDT')
+
+            restarted = OfflineSymbolManager(cache_path=path)
+            self.assertEqual(restarted.get_exchange_symbols('binance', 'USDT'), symbols)
+            self.assertEqual(self.binance.loads, 1)
+
+    def test_persisted_top_coins(self):
+        """Test a fresh CoinGecko ranking on disk is used without a download"""
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'top_coins.json'), 'w') as f:
+                f.write('[{"id": "bitcoin", "symbol": "btc", "market_cap": 5}]')
+            manager = SymbolManager(cache_path=os.path.join(directory, 'symbols.json'))
+            self.assertEqual(manager._mcap_by_base, {'BTC': 5, 'BITCOIN': 5})
+
+if __name__ == '__main__':
+    unittest.main()
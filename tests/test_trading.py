@@ -0,0 +1,146 @@
+import math
+import unittest
+import numpy as np
+import pandas as pd
+from core.trading import PaperTrader
+
+class TestPaperTrader(unittest.TestCase):
+    def setUp(self):
+        """Set up a trader with a fixed sequence of round trips"""
+        self.trader = PaperTrader(initial_balance=10000.0, fee_rate=0.001)
+        for entry, exit_ in [(100.0, 110.0), (100.0, 90.0), (100.0, 80.0), (100.0, 130.0)]:
+            self.trader.open_position('BTC/USDT', 'binance', entry, 10.0, 'long')
+            self.trader.close_position('BTC/USDT', exit_)
+
+    def test_pnl_summary(self):
+        """Test aggregate P&L, fees and win rate"""
+        summary = self.trader.get_pnl_summary()
+        self.assertAlmostEqual(summary['total_pnl'], 100.0 - 100.0 - 200.0 + 300.0)
+        self.assertAlmostEqual(summary['total_fees'], (1100 + 900 + 800 + 1300) * 0.001)
+        self.assertEqual(summary['total_trades'], 4)
+        self.assertEqual(summary['win_trades'], 2)
+        self.assertEqual(summary['win_rate'], 50.0)
+
+        # Memoized until the next trade, and callers get their own copy
+        summary['total_pnl'] = None
+        self.assertEqual(self.trader.get_pnl_summary()['total_pnl'], 100.0)
+        self.assertEqual(self.trader.calculate_metrics()['total_trades'], 4)
+        self.trader.open_position('BTC/USDT', 'binance', 100.0, 1.0, 'long')
+        self.trader.close_position('BTC/USDT', 150.0)
+        self.assertEqual(self.trader.get_pnl_summary()['total_trades'], 5)
+        self.assertEqual(self.trader.calculate_metrics()['total_trades'], 5)
+
+    def test_calculate_metrics(self):
+        """Test win/loss partition and drawdown"""
+        metrics = self.trader.calculate_metrics()
+        self.assertEqual(metrics['total_trades'], 4)
+        self.assertAlmostEqual(metrics['profit_factor'], 400.0 / 300.0)
+        self.assertAlmostEqual(metrics['average_win'], 200.0)
+        self.assertAlmostEqual(metrics['average_loss'], 150.0)
+
+        # Deepest trough is after the two losing trades; the running balance
+        # only counts closing fees
+        peak = 10000.0 + 100.0 - 1.1
+        trough = peak - 100.0 - 0.9 - 200.0 - 0.8
+        self.assertAlmostEqual(metrics['max_drawdown'], (peak - trough) / peak * 100)
+
+        self.assertEqual(PaperTrader().calculate_metrics()['total_trades'], 0)
+
+    def test_sharpe_ratio(self):
+        """Test the fused equity kernel against the NumPy formula"""
+        net = np.array([100.0 - 1.1, -100.0 - 0.9, -200.0 - 0.8, 300.0 - 1.3])
+        balances = 10000.0 + np.concatenate(([0.0], np.cumsum(net)))
+        returns = np.diff(balances) / balances[:-1] - 0.02 / 252
+        expected = np.sqrt(252) * returns.mean() / returns.std()
+        self.assertAlmostEqual(self.trader.calculate_metrics()['sharpe_ratio'], expected)
+
+        trader = PaperTrader()
+        trader.open_position('BTC/USDT', 'binance', 100.0, 1.0, 'long')
+        trader.close_position('BTC/USDT', 110.0)
+        self.assertEqual(trader.calculate_metrics()['sharpe_ratio'], 0)
+
+    def test_many_trades(self):
+        """Test trade buffers grow past their initial capacity"""
+        trader = PaperTrader()
+        for _ in range(3000):
+            trader.open_position('ETH/USDT', 'kucoin', 10.0, 1.0, 'short')
+            trader.close_position('ETH/USDT', 9.0)
+
+        summary = trader.get_pnl_summary()
+        self.assertEqual(summary['total_trades'], 3000)
+        self.assertEqual(summary['win_trades'], 3000)
+        self.assertAlmostEqual(summary['total_pnl'], 3000.0)
+        self.assertAlmostEqual(summary['total_pnl'], trader._pnls[:trader._n_trades].sum())
+        self.assertAlmostEqual(trader.calculate_metrics()['average_win'], 1.0)
+        self.assertEqual(len(trader.closed_trades), 3000)
+        self.assertIsNotNone(trader.closed_trades[-1])
+
+    def test_exact_totals(self):
+        """Test running totals do not drift with many small trades"""
+        trader = PaperTrader(fee_rate=0.0)
+        for _ in range(1000):
+            trader.open_position('BTC/USDT', 'binance', 1.0, 1.0, 'long')
+            trader.close_position('BTC/USDT', 1.1)
+        self.assertEqual(trader.get_pnl_summary()['total_pnl'], math.fsum(t.pnl for t in trader.closed_trades))
+
+    def test_trade_columns(self):
+        """Test columnar trade fields match the closed trades"""
+        columns = self.trader.trade_columns()
+        trades = self.trader.closed_trades
+        self.assertEqual(list(columns['symbol']), [t.symbol for t in trades])
+        self.assertEqual(list(columns['side']), [t.side for t in trades])
+        np.testing.assert_array_equal(columns['exit_price'], [110.0, 90.0, 80.0, 130.0])
+        np.testing.assert_array_equal(columns['pnl'], [t.pnl for t in trades])
+        self.assertEqual(pd.Timestamp(columns['exit_time'][-1]).value, trades[-1].exit_time_ns)
+
+        self.assertEqual(len(PaperTrader().trade_columns()['pnl']), 0)
+
+    def test_close_positions_bulk(self):
+        """Test bulk closes match closing one position at a time"""
+        symbols = [f'SYM{i}/USDT' for i in range(1500)]
+        prices = np.linspace(1.0, 2.0, len(symbols))
+        single, bulk = PaperTrader(initial_balance=1e6), PaperTrader(initial_balance=1e6)
+        for trader in (single, bulk):
+            for i, symbol in enumerate(symbols):
+                trader.open_position(symbol, 'binance', 1.5, 2.0, 'long' if i % 2 else 'short')
+
+        for symbol, price in zip(symbols, prices):
+            single.close_position(symbol, price)
+        trades = bulk.close_positions_bulk(symbols + ['MISSING/USDT'], np.append(prices, 1.0))
+
+        self.assertEqual(len(trades), len(symbols))
+        self.assertFalse(bulk.open_positions)
+        self.assertEqual([t.pnl for t in trades], [t.pnl for t in single.closed_trades])
+        self.assertAlmostEqual(bulk.current_balance, single.current_balance)
+        for key, value in single.get_pnl_summary().items():
+            self.assertAlmostEqual(bulk.get_pnl_summary()[key], value)
+        self.assertAlmostEqual(bulk.calculate_metrics()['max_drawdown'],
+                               single.calculate_metrics()['max_drawdown'])
+
+    def test_event_log(self):
+        """Test trade events are recorded in a bounded ring buffer"""
+        self.assertEqual([event[0] for event in self.trader.event_log], ['open', 'close'] * 4)
+        self.assertEqual(self.trader.event_log[1][:4], ('close', 'BTC/USDT', 110.0, 100.0))
+
+        trader = PaperTrader(event_log_size=3)
+        for _ in range(2):
+            trader.open_position('BTC/USDT', 'binance', 100.0, 1.0, 'short')
+            trader.close_position('BTC/USDT', 90.0)
+        self.assertEqual([event[0] for event in trader.event_log], ['close', 'open', 'close'])
+
+    def test_timestamps(self):
+        """Test replayed trades keep the bar timestamps they are given"""
+        trader = PaperTrader()
+        entry, exit_ = pd.Timestamp('2024-01-01 00:00'), pd.Timestamp('2024-01-01 00:05')
+        position = trader.open_position('BTC/USDT', 'binance', 100.0, 1.0, 'long', timestamp=entry)
+        trade = trader.close_position('BTC/USDT', 101.0, timestamp=exit_)
+        self.assertEqual(position.entry_time, entry)
+        self.assertEqual((trade.entry_time, trade.exit_time), (entry, exit_))
+        self.assertEqual(trade.exit_time_ns - trade.entry_time_ns, 300 * 10**9)
+
+        aware = pd.Timestamp('2024-01-01 02:00', tz='Europe/Berlin')
+        trader.open_position('BTC/USDT', 'binance', 100.0, 1.0, 'long', timestamp=aware)
+        self.assertEqual(trader.get_position('BTC/USDT').entry_time_ns, aware.value)
+
+if __name__ == '__main__':
+    unittest.main()
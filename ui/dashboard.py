@@ -5,10 +5,11 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.express as px
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
 from streamlit_option_menu import option_menu
-from streamlit_autorefresh import st_autorefresh
 
 # Add the project root to the Python path
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -17,10 +18,29 @@ if ROOT_DIR not in sys.path:
 
 from core.data import ExchangeDataCollector
 from core.trading import PaperTrader
-from core.strategy import Strategy
-from core.arbitrage import ArbitrageDetector
+from core.strategy import Strategy, warm_up_kernels
+from core.arbitrage import ArbitrageDetector, warm_up_kernels as warm_up_arbitrage_kernels
 from utils.symbol_manager import SymbolManager
-from utils.metrics import MarketMetrics
+from utils.metrics import MarketMetrics, warm_up_kernels as warm_up_metric_kernels
+from utils.downsample import lttb, downsample_ohlcv, resample_ohlcv
+from utils.cache import DiskFrameCache
+
+# Upper bound on points per trace; more than this exceeds the chart's pixel
+# width and only costs serialization and browser render time
+MAX_CHART_POINTS = 2000
+
+# Candles per terminal chart; narrower candles alias onto the same pixels
+MAX_CANDLES = 800
+
+# Market Overview trace colors per exchange: (candles, volume, RSI)
+EXCHANGE_COLORS = {
+    exchange: (color, color, color)
+    for exchange, color in {'binance': '#F0B90B', 'kucoin': '#26A17B', 'okx': '#121212', 'bybit': '#FFD700'}.items()
+}
+DEFAULT_COLORS = ('#26A69A', '#888888', '#888888')
+
+# Built figures kept per session
+MAX_CACHED_FIGURES = 8
 
 # Page config
 st.set_page_config(
@@ -67,16 +87,17 @@ st.markdown('<h1 class="dashboard-title">📊 CrossX</h1>', unsafe_allow_html=Tr
 def init_components():
     data_collector = ExchangeDataCollector()
     strategy = Strategy()
+    # Keep JIT compilation off the first chart, scan and backtest
+    warm_up_kernels()
+    warm_up_metric_kernels()
+    warm_up_arbitrage_kernels()
     paper_trader = PaperTrader()
     arbitrage_detector = ArbitrageDetector(data_collector)
-    symbol_manager = SymbolManager()
+    symbol_manager = SymbolManager(cache_path=os.path.join(ROOT_DIR, '.cache', 'symbols.json'))
     return data_collector, strategy, paper_trader, arbitrage_detector, symbol_manager
 
 data_collector, strategy, paper_trader, arbitrage_detector, symbol_manager = init_components()
 
-# Auto-refresh every 30 seconds
-st_autorefresh(interval=30000, key="datarefresh")
-
 # Sidebar
 with st.sidebar:
     selected_tab = option_menu(
@@ -104,6 +125,47 @@ def get_available_symbols(exchanges, quote_currency, top_coins_only):
 
 symbols = get_available_symbols(exchanges, quote_currency, top_coins_only)
 
+# OHLCV with indicators, shared across reruns and sessions; the TTL matches
+# the panel refresh interval so each refresh sees at most one recomputation
+@st.cache_data(ttl=30, show_spinner=False)
+def load_ohlcv(symbol, exchange, timeframe, days):
+    df = data_collector.get_historical_data(symbol, exchange, timeframe, days)
+    return MarketMetrics.calculate_indicators(df)
+
+# Backtest results, reused for identical inputs until the next 5m bar closes
+@st.cache_data(ttl=300, show_spinner=False)
+def run_backtest(symbol, exchange, days, initial_balance, risk_per_trade):
+    df = data_collector.get_historical_data(symbol, exchange, timeframe='5m', days=days)
+    if df.empty:
+        return None
+    return strategy.backtest(df, initial_balance, risk_per_trade)
+
+# Historical spreads, kept in memory and on disk so restarts and other
+# sessions reuse them until the next 5m bar closes
+spread_cache = DiskFrameCache(os.path.join(ROOT_DIR, '.cache', 'spreads'), ttl=300)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_spreads(symbol, exchanges):
+    key = f"{symbol}_{'-'.join(exchanges)}"
+    df = spread_cache.get(key)
+    if df is None:
+        df = arbitrage_detector.get_historical_spreads(symbol, list(exchanges))
+        if not df.empty:
+            spread_cache.set(key, df)
+    return df
+
+# Plotly figures, reused across reruns while their inputs are unchanged
+def cached_figure(key, build):
+    figs = st.session_state.setdefault('figs', OrderedDict())
+    if key in figs:
+        figs.move_to_end(key)
+        return figs[key]
+
+    fig = figs[key] = build()
+    if len(figs) > MAX_CACHED_FIGURES:
+        figs.popitem(last=False)
+    return fig
+
 # Market Overview Tab
 if selected_tab == "Market Overview":
     st.title("Market Overview")
@@ -129,173 +191,201 @@ if selected_tab == "Market Overview":
     with timeframe_col2:
         days = st.number_input("Days of Data", min_value=1, max_value=30, value=5)
     
-    # Create tabs for different views
-    tab1, tab2, tab3 = st.tabs(["Price Action", "Technical Analysis", "Exchange Comparison"])
+    # Charts and metrics refresh on their own every 30 seconds without
+    # rerunning the rest of the page
+    @st.fragment(run_every=30)
+    def market_panel(selected_symbol, timeframe, days):
+        # Create tabs for different views
+        tab1, tab2, tab3 = st.tabs(["Price Action", "Technical Analysis", "Exchange Comparison"])
     
-    with tab1:
-        with st.spinner("Loading market data..."):
-            # Fetch and process data
-            dfs = {}
-            current_prices = {}
-            for exchange in exchanges:
-                df = data_collector.get_historical_data(selected_symbol, exchange, timeframe, days)
-                if not df.empty:
-                    dfs[exchange] = MarketMetrics.calculate_indicators(df)
-                    current_prices[exchange] = df['close'].iloc[-1]
+        with tab1:
+            with st.spinner("Loading market data..."):
+                # Fetch and process data; each fetch waits on the network, so the
+                # exchanges are loaded concurrently
+                dfs = {}
+                current_prices = {}
+                with ThreadPoolExecutor(max_workers=max(len(exchanges), 1)) as pool:
+                    loaded = pool.map(lambda ex: load_ohlcv(selected_symbol, ex, timeframe, days), exchanges)
+                for exchange, df in zip(exchanges, loaded):
+                    if not df.empty:
+                        dfs[exchange] = df
+                        current_prices[exchange] = df['close'].iloc[-1]
             
-            if dfs:
-                # Create main chart
-                fig = make_subplots(
-                    rows=3, cols=1,
-                    shared_xaxes=True,
-                    vertical_spacing=0.05,
-                    row_heights=[0.6, 0.2, 0.2],
-                    subplot_titles=("Price", "Volume", "RSI")
-                )
-                
-                colors = {'binance': '#F0B90B', 'kucoin': '#26A17B', 'okx': '#121212', 'bybit': '#FFD700'}
+                if dfs:
+                    def build_chart():
+                        # Create main chart
+                        fig = make_subplots(
+                            rows=3, cols=1,
+                            shared_xaxes=True,
+                            vertical_spacing=0.05,
+                            row_heights=[0.6, 0.2, 0.2],
+                            subplot_titles=("Price", "Volume", "RSI")
+                        )
                 
-                for exchange, df in dfs.items():
-                    # Candlestick chart
-                    fig.add_trace(
-                        go.Candlestick(
-                            x=df.index,
-                            open=df['open'],
-                            high=df['high'],
-                            low=df['low'],
-                            close=df['close'],
-                            name=f"{exchange.capitalize()} OHLC",
-                            increasing_line_color=colors.get(exchange, '#26A69A'),
-                            decreasing_line_color='#EF5350'
-                        ),
-                        row=1, col=1
-                    )
+                        for exchange, df in dfs.items():
+                            ohlc_color, volume_color, rsi_color = EXCHANGE_COLORS.get(exchange, DEFAULT_COLORS)
+
+                            # Merge bars and thin the RSI line down to the chart width
+                            bars = downsample_ohlcv(df, MAX_CHART_POINTS)
+                            rsi = lttb(df['rsi'].dropna(), MAX_CHART_POINTS)
+
+                            # Plain arrays go straight to Plotly without per-element boxing;
+                            # float32 halves what it serializes, while the cached frames stay
+                            # float64 for the metrics and spread figures
+                            x = bars.index.to_numpy()
+                            o, h, l, c, v = (bars[col].to_numpy(np.float32) for col in ('open', 'high', 'low', 'close', 'volume'))
+
+                            # Candlestick chart
+                            fig.add_trace(
+                                go.Candlestick(
+                                    x=x,
+                                    open=o,
+                                    high=h,
+                                    low=l,
+                                    close=c,
+                                    name=f"{exchange.capitalize()} OHLC",
+                                    increasing_line_color=ohlc_color,
+                                    decreasing_line_color='#EF5350'
+                                ),
+                                row=1, col=1
+                            )
                     
-                    # Volume
-                    fig.add_trace(
-                        go.Bar(
-                            x=df.index,
-                            y=df['volume'],
-                            name=f"{exchange.capitalize()} Volume",
-                            marker_color=colors.get(exchange, '#888888'),
-                            opacity=0.3
-                        ),
-                        row=2, col=1
-                    )
+                            # Volume
+                            fig.add_trace(
+                                go.Bar(
+                                    x=x,
+                                    y=v,
+                                    name=f"{exchange.capitalize()} Volume",
+                                    marker_color=volume_color,
+                                    opacity=0.3
+                                ),
+                                row=2, col=1
+                            )
                     
-                    # RSI
-                    fig.add_trace(
-                        go.Scatter(
-                            x=df.index,
-                            y=df['rsi'],
-                            name=f"{exchange.capitalize()} RSI",
-                            line=dict(color=colors.get(exchange, '#888888'))
-                        ),
-                        row=3, col=1
-                    )
+                            # RSI
+                            fig.add_trace(
+                                go.Scattergl(
+                                    x=rsi.index.to_numpy(),
+                                    y=rsi.to_numpy(np.float32),
+                                    name=f"{exchange.capitalize()} RSI",
+                                    line=dict(color=rsi_color)
+                                ),
+                                row=3, col=1
+                            )
                 
-                # Add RSI levels
-                fig.add_hline(y=70, line_dash="dash", line_color="#ff0000", row=3, col=1)
-                fig.add_hline(y=30, line_dash="dash", line_color="#00ff00", row=3, col=1)
+                        # Add RSI levels
+                        fig.add_hline(y=70, line_dash="dash", line_color="#ff0000", row=3, col=1)
+                        fig.add_hline(y=30, line_dash="dash", line_color="#00ff00", row=3, col=1)
                 
-                fig.update_layout(
-                    height=800,
-                    template="plotly_dark",
-                    showlegend=True,
-                    legend=dict(
-                        yanchor="top",
-                        y=0.99,
-                        xanchor="left",
-                        x=0.01
-                    ),
-                    margin=dict(l=50, r=50, t=30, b=50)
-                )
+                        fig.update_layout(
+                            height=800,
+                            template="plotly_dark",
+                            showlegend=True,
+                            legend=dict(
+                                yanchor="top",
+                                y=0.99,
+                                xanchor="left",
+                                x=0.01
+                            ),
+                            margin=dict(l=50, r=50, t=30, b=50)
+                        )
+                        return fig
+
+                    # Rebuilt only when new data arrives; the last bar's close and
+                    # volume keep changing until it closes
+                    key = ('mkt', selected_symbol, timeframe, days, tuple(
+                        (exchange, df.index[-1], df['close'].iloc[-1], df['volume'].iloc[-1])
+                        for exchange, df in dfs.items()
+                    ))
+                    fig = cached_figure(key, build_chart)
                 
-                st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True)
                 
-                # Market Metrics
-                for exchange, df in dfs.items():
-                    metrics = MarketMetrics.calculate_metrics(df)
-                    summary = MarketMetrics.get_summary_metrics(df)
+                    # Market Metrics
+                    for exchange, df in dfs.items():
+                        metrics = MarketMetrics.calculate_metrics(df)
+                        summary = MarketMetrics.get_summary_metrics(df)
                     
-                    st.subheader(f"{exchange.capitalize()} Market Metrics")
-                    col1, col2, col3, col4 = st.columns(4)
+                        st.subheader(f"{exchange.capitalize()} Market Metrics")
+                        col1, col2, col3, col4 = st.columns(4)
                     
-                    with col1:
-                        st.metric(
-                            "Price",
-                            f"${metrics['last_price']:.2f}",
-                            f"{metrics['price_change_24h']:.2f}%"
-                        )
-                    with col2:
-                        st.metric(
-                            "24h Range",
-                            f"${metrics['high_24h']:.2f}",
-                            f"${metrics['low_24h']:.2f}"
-                        )
-                    with col3:
-                        st.metric(
-                            "24h Volume",
-                            f"${metrics['volume_24h']:,.0f}"
-                        )
-                    with col4:
-                        st.metric(
-                            "Volatility",
-                            f"{metrics['volatility_24h']:.2f}%"
-                        )
+                        with col1:
+                            st.metric(
+                                "Price",
+                                f"${metrics['last_price']:.2f}",
+                                f"{metrics['price_change_24h']:.2f}%"
+                            )
+                        with col2:
+                            st.metric(
+                                "24h Range",
+                                f"${metrics['high_24h']:.2f}",
+                                f"${metrics['low_24h']:.2f}"
+                            )
+                        with col3:
+                            st.metric(
+                                "24h Volume",
+                                f"${metrics['volume_24h']:,.0f}"
+                            )
+                        with col4:
+                            st.metric(
+                                "Volatility",
+                                f"{metrics['volatility_24h']:.2f}%"
+                            )
     
-    with tab2:
-        if dfs:
-            for exchange, df in dfs.items():
-                st.subheader(f"{exchange.capitalize()} Technical Analysis")
+        with tab2:
+            if dfs:
+                for exchange, df in dfs.items():
+                    st.subheader(f"{exchange.capitalize()} Technical Analysis")
+                    latest = df.iloc[-1]
                 
-                # Technical Indicators
-                col1, col2, col3, col4 = st.columns(4)
+                    # Technical Indicators
+                    col1, col2, col3, col4 = st.columns(4)
                 
-                with col1:
-                    rsi = df['rsi'].iloc[-1]
-                    rsi_color = "🟢" if rsi < 30 else "🔴" if rsi > 70 else "⚪"
-                    st.metric("RSI", f"{rsi_color} {rsi:.1f}")
+                    with col1:
+                        rsi = latest['rsi']
+                        rsi_color = "🟢" if rsi < 30 else "🔴" if rsi > 70 else "⚪"
+                        st.metric("RSI", f"{rsi_color} {rsi:.1f}")
                 
-                with col2:
-                    macd = df['macd_line'].iloc[-1]
-                    signal = df['macd_signal'].iloc[-1]
-                    macd_color = "🟢" if macd > signal else "🔴"
-                    st.metric("MACD", f"{macd_color} {macd:.2f}")
+                    with col2:
+                        macd = latest['macd_line']
+                        signal = latest['macd_signal']
+                        macd_color = "🟢" if macd > signal else "🔴"
+                        st.metric("MACD", f"{macd_color} {macd:.2f}")
                 
-                with col3:
-                    trend = "🟢 Bullish" if df['close'].iloc[-1] > df['sma_50'].iloc[-1] else "🔴 Bearish"
-                    st.metric("Trend", trend)
+                    with col3:
+                        trend = "🟢 Bullish" if latest['close'] > latest['sma_50'] else "🔴 Bearish"
+                        st.metric("Trend", trend)
                 
-                with col4:
-                    st.metric("ATR", f"{df['atr'].iloc[-1]:.2f}")
+                    with col4:
+                        st.metric("ATR", f"{latest['atr']:.2f}")
     
-    with tab3:
-        if len(current_prices) > 1:
-            st.subheader("Exchange Price Comparison")
+        with tab3:
+            if len(current_prices) > 1:
+                st.subheader("Exchange Price Comparison")
             
-            # Calculate arbitrage opportunities
-            arb_metrics = MarketMetrics.calculate_arbitrage_metrics(current_prices)
+                # Calculate arbitrage opportunities
+                arb_metrics = MarketMetrics.calculate_arbitrage_metrics(current_prices)
             
-            # Display opportunities
-            if arb_metrics['opportunities']:
-                st.warning("Arbitrage Opportunities Detected!")
-                for opp in arb_metrics['opportunities']:
-                    st.info(
-                        f"💰 Potential {opp['spread']:.2f}% profit: "
-                        f"Buy on {opp['buy_exchange']} (${opp['buy_price']:.2f}) → "
-                        f"Sell on {opp['sell_exchange']} (${opp['sell_price']:.2f})"
-                    )
+                # Display opportunities
+                if arb_metrics['opportunities']:
+                    st.warning("Arbitrage Opportunities Detected!")
+                    for opp in arb_metrics['opportunities']:
+                        st.info(
+                            f"💰 Potential {opp['spread']:.2f}% profit: "
+                            f"Buy on {opp['buy_exchange']} (${opp['buy_price']:.2f}) → "
+                            f"Sell on {opp['sell_exchange']} (${opp['sell_price']:.2f})"
+                        )
             
-            # Display price comparison matrix
-            spread_df = pd.DataFrame(
-                [[f"{float(arb_metrics['spreads'].get((k, ex), 0)):.2f}%" if k != ex else "-" 
-                  for ex in exchanges] 
-                 for k in exchanges],
-                index=exchanges,
-                columns=exchanges
-            )
-            st.dataframe(spread_df, use_container_width=True)
+                # Display price comparison matrix: spread from the row exchange's
+                # price to the column exchange's, in one broadcast
+                names = list(current_prices)
+                prices = np.array([current_prices[ex] for ex in names], dtype=np.float64)
+                spread_mat = (prices[None, :] - prices[:, None]) / prices[:, None] * 100
+                np.fill_diagonal(spread_mat, np.nan)
+                spread_df = pd.DataFrame(spread_mat, index=names, columns=names)
+                st.dataframe(spread_df.style.format('{:.2f}%', na_rep='-'), use_container_width=True)
+
+    market_panel(selected_symbol, timeframe, days)
 
 elif selected_tab == "Trading Terminal":
     st.title("Trading Terminal")
@@ -307,52 +397,68 @@ elif selected_tab == "Trading Terminal":
         # Trading pair selection
         selected_symbol = st.selectbox("Select Trading Pair", symbols)
         selected_exchange = st.selectbox("Select Exchange", exchanges)
+
+        # Stream the selected pair so order prices come from live pushes
+        data_collector.subscribe(selected_symbol, selected_exchange)
         
-        # Fetch and display current market data
-        with st.spinner("Loading market data..."):
-            df = data_collector.get_historical_data(selected_symbol, selected_exchange, '1m', days=1)
-            if not df.empty:
-                df = MarketMetrics.calculate_indicators(df)
-                
-                # Price chart with indicators
-                fig = make_subplots(
-                    rows=2, cols=1,
-                    shared_xaxes=True,
-                    vertical_spacing=0.05,
-                    row_heights=[0.7, 0.3]
-                )
-                
-                fig.add_trace(
-                    go.Candlestick(
-                        x=df.index,
-                        open=df['open'],
-                        high=df['high'],
-                        low=df['low'],
-                        close=df['close'],
-                        name="OHLC"
-                    ),
-                    row=1, col=1
-                )
+        # The chart refreshes on its own every 30 seconds
+        @st.fragment(run_every=30)
+        def terminal_chart(selected_symbol, selected_exchange):
+            # Fetch and display current market data
+            with st.spinner("Loading market data..."):
+                df = load_ohlcv(selected_symbol, selected_exchange, '1m', 1)
+                if not df.empty:
+                    # Indicators come from the raw 1m bars; only the plotted bars are merged
+                    df = resample_ohlcv(df, MAX_CANDLES)
+                    x = df.index.to_numpy()
+                    o, h, l, c, v = (df[col].to_numpy(np.float32) for col in ('open', 'high', 'low', 'close', 'volume'))
+
+                    def build_chart():
+                        # Price chart with indicators
+                        fig = make_subplots(
+                            rows=2, cols=1,
+                            shared_xaxes=True,
+                            vertical_spacing=0.05,
+                            row_heights=[0.7, 0.3]
+                        )
                 
-                # Add EMAs
-                fig.add_trace(go.Scatter(x=df.index, y=df['ema_8'], 
-                    name="EMA8", line=dict(color='blue')), row=1, col=1)
-                fig.add_trace(go.Scatter(x=df.index, y=df['ema_21'], 
-                    name="EMA21", line=dict(color='orange')), row=1, col=1)
+                        fig.add_trace(
+                            go.Candlestick(
+                                x=x,
+                                open=o,
+                                high=h,
+                                low=l,
+                                close=c,
+                                name="OHLC"
+                            ),
+                            row=1, col=1
+                        )
                 
-                # Volume bars
-                colors = ['red' if row['open'] > row['close'] else 'green' 
-                         for _, row in df.iterrows()]
-                fig.add_trace(go.Bar(x=df.index, y=df['volume'],
-                    marker_color=colors, name="Volume"), row=2, col=1)
+                        # Add EMAs
+                        fig.add_trace(go.Scattergl(x=x, y=df['ema_8'].to_numpy(np.float32),
+                            name="EMA8", line=dict(color='blue')), row=1, col=1)
+                        fig.add_trace(go.Scattergl(x=x, y=df['ema_21'].to_numpy(np.float32),
+                            name="EMA21", line=dict(color='orange')), row=1, col=1)
                 
-                fig.update_layout(
-                    height=600,
-                    template="plotly_dark",
-                    xaxis_rangeslider_visible=False
-                )
+                        # Volume bars
+                        colors = np.where(o > c, 'red', 'green')
+                        fig.add_trace(go.Bar(x=x, y=v,
+                            marker_color=colors, name="Volume"), row=2, col=1)
                 
-                st.plotly_chart(fig, use_container_width=True)
+                        fig.update_layout(
+                            height=600,
+                            template="plotly_dark",
+                            xaxis_rangeslider_visible=False
+                        )
+                        return fig
+
+                    # Rebuilt only when a bar closes or the live bar moves
+                    key = ('term', selected_symbol, selected_exchange, x[-1], c[-1], v[-1])
+                    fig = cached_figure(key, build_chart)
+
+                    st.plotly_chart(fig, use_container_width=True)
+
+        terminal_chart(selected_symbol, selected_exchange)
     
     with right_col:
         st.subheader("Trading Controls")
@@ -374,89 +480,88 @@ elif selected_tab == "Trading Terminal":
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            if st.button("Long 📈", type="primary"):
-                ticker = data_collector.get_ticker(selected_symbol, selected_exchange)
-                if ticker and ticker['last'] > 0:
-                    size = amount / ticker['last']
-                    trade = paper_trader.open_position(
-                        selected_symbol,
-                        selected_exchange,
-                        ticker['last'],
-                        size,
-                        'long'
-                    )
-                    if trade:
-                        st.success(f"Opened LONG position at ${ticker['last']:.2f}")
-                    else:
-                        st.error("Failed to open position")
-        
+            long_clicked = st.button("Long 📈", type="primary")
         with col2:
-            if st.button("Short 📉", type="primary"):
-                ticker = data_collector.get_ticker(selected_symbol, selected_exchange)
-                if ticker and ticker['last'] > 0:
-                    size = amount / ticker['last']
-                    trade = paper_trader.open_position(
-                        selected_symbol,
-                        selected_exchange,
-                        ticker['last'],
-                        size,
-                        'short'
-                    )
-                    if trade:
-                        st.success(f"Opened SHORT position at ${ticker['last']:.2f}")
-                    else:
-                        st.error("Failed to open position")
-        
+            short_clicked = st.button("Short 📉", type="primary")
         with col3:
-            if st.button("Close ⭕"):
-                ticker = data_collector.get_ticker(selected_symbol, selected_exchange)
-                if ticker:
-                    trade = paper_trader.close_position(selected_symbol, ticker['last'])
+            close_clicked = st.button("Close ⭕")
+        
+        # A single ticker read prices whichever action was clicked; plain
+        # reruns fetch nothing
+        if long_clicked or short_clicked or close_clicked:
+            ticker = data_collector.get_ticker(selected_symbol, selected_exchange)
+            price = ticker['last'] if ticker else None
+
+            if close_clicked:
+                if price:
+                    trade = paper_trader.close_position(selected_symbol, price)
                     if trade:
                         pnl_percent = (trade.pnl / amount) * 100
                         st.success(f"Closed position with P&L: ${trade.pnl:.2f} ({pnl_percent:.2f}%)")
                     else:
                         st.warning("No open position to close")
+            elif price and price > 0:
+                side = 'long' if long_clicked else 'short'
+                trade = paper_trader.open_position(
+                    selected_symbol,
+                    selected_exchange,
+                    price,
+                    amount / price,
+                    side
+                )
+                if trade:
+                    st.success(f"Opened {side.upper()} position at ${price:.2f}")
+                else:
+                    st.error("Failed to open position")
         
-        # Open Positions
-        st.subheader("Open Positions")
-        if paper_trader.open_positions:
-            for symbol, position in paper_trader.open_positions.items():
-                ticker = data_collector.get_ticker(symbol, position.exchange)
-                if ticker:
-                    current_price = ticker['last']
-                    if position.side == 'long':
-                        unrealized_pnl = (current_price - position.entry_price) * position.position_size
-                    else:
-                        unrealized_pnl = (position.entry_price - current_price) * position.position_size
+        # Positions and history refresh on their own every 30 seconds
+        @st.fragment(run_every=30)
+        def positions_panel():
+            # Open Positions
+            st.subheader("Open Positions")
+            if paper_trader.open_positions:
+                # One ticker snapshot per exchange for every open position
+                symbols_by_exchange = {}
+                for symbol, position in paper_trader.open_positions.items():
+                    symbols_by_exchange.setdefault(position.exchange, []).append(symbol)
+                tickers = {
+                    exchange: data_collector.get_tickers_bulk(exchange_symbols, exchange)
+                    for exchange, exchange_symbols in symbols_by_exchange.items()
+                }
+
+                for symbol, position in paper_trader.open_positions.items():
+                    ticker = tickers[position.exchange].get(symbol)
+                    if ticker:
+                        current_price = ticker['last']
+                        unrealized_pnl = position.sign * (current_price - position.entry_price) * position.position_size
                     
-                    st.info(
-                        f"Symbol: {symbol}\n\n"
-                        f"Side: {position.side.upper()}\n\n"
-                        f"Entry: ${position.entry_price:.2f}\n\n"
-                        f"Current: ${current_price:.2f}\n\n"
-                        f"Unrealized P&L: ${unrealized_pnl:.2f}"
-                    )
-        else:
-            st.info("No open positions")
+                        st.info(
+                            f"Symbol: {symbol}\n\n"
+                            f"Side: {position.side.upper()}\n\n"
+                            f"Entry: ${position.entry_price:.2f}\n\n"
+                            f"Current: ${current_price:.2f}\n\n"
+                            f"Unrealized P&L: ${unrealized_pnl:.2f}"
+                        )
+            else:
+                st.info("No open positions")
         
-        # Trade History
-        st.subheader("Trade History")
-        if paper_trader.closed_trades:
-            history_df = pd.DataFrame([
-                {
-                    'Symbol': t.symbol,
-                    'Side': t.side,
-                    'Entry': t.entry_price,
-                    'Exit': t.exit_price,
-                    'P&L': t.pnl,
-                    'Time': t.exit_time
-                }
-                for t in paper_trader.closed_trades
-            ])
-            st.dataframe(history_df, use_container_width=True)
-        else:
-            st.info("No trade history")
+            # Trade History
+            st.subheader("Trade History")
+            if paper_trader.closed_trades:
+                columns = paper_trader.trade_columns()
+                history_df = pd.DataFrame({
+                    'Symbol': columns['symbol'],
+                    'Side': columns['side'],
+                    'Entry': columns['entry_price'],
+                    'Exit': columns['exit_price'],
+                    'P&L': columns['pnl'],
+                    'Time': columns['exit_time']
+                })
+                st.dataframe(history_df, use_container_width=True)
+            else:
+                st.info("No trade history")
+
+        positions_panel()
 
 elif selected_tab == "Strategy Backtest":
     st.title("Strategy Backtest")
@@ -491,18 +596,16 @@ elif selected_tab == "Strategy Backtest":
     
     if st.button("Run Backtest", type="primary"):
         with st.spinner("Running backtest..."):
-            # Fetch historical data
-            df = data_collector.get_historical_data(
+            # Fetch historical data and run backtest
+            results = run_backtest(
                 backtest_symbol,
                 backtest_exchange,
-                timeframe='5m',
-                days=backtest_days
+                backtest_days,
+                initial_balance,
+                risk_per_trade
             )
             
-            if not df.empty:
-                # Run backtest
-                results = strategy.backtest(df, initial_balance, risk_per_trade)
-                
+            if results is not None:
                 # Display results
                 col1, col2, col3, col4 = st.columns(4)
                 
@@ -521,26 +624,41 @@ elif selected_tab == "Strategy Backtest":
                 
                 # Equity curve
                 st.subheader("Equity Curve")
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    y=results['equity_curve'],
-                    name="Portfolio Value",
-                    line=dict(color='green')
-                ))
-                fig.update_layout(
-                    template="plotly_dark",
-                    height=400,
-                    yaxis_title="Portfolio Value (USDT)"
-                )
+
+                def build_equity_chart():
+                    # One point per bar is far more than the chart can show
+                    equity = lttb(pd.Series(results['equity_curve'], dtype=np.float64), MAX_CHART_POINTS)
+                    fig = go.Figure()
+                    fig.add_trace(go.Scattergl(
+                        x=equity.index.to_numpy(),
+                        y=equity.to_numpy(),
+                        name="Portfolio Value",
+                        line=dict(color='green')
+                    ))
+                    fig.update_layout(
+                        template="plotly_dark",
+                        height=400,
+                        yaxis_title="Portfolio Value (USDT)"
+                    )
+                    return fig
+
+                # Same inputs give the same cached results, so the figure is reused too
+                key = ('backtest', backtest_symbol, backtest_exchange, backtest_days,
+                       initial_balance, risk_per_trade, len(results['equity_curve']),
+                       float(results['equity_curve'][-1]))
+                fig = cached_figure(key, build_equity_chart)
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Trade list
-                if results['trades']:
+                records = results['trade_records']
+                if len(records):
                     st.subheader("Trade History")
-                    trades_df = pd.DataFrame(results['trades'])
-                    trades_df['pnl'] = trades_df['pnl'].round(2)
-                    trades_df['entry_price'] = trades_df['entry_price'].round(2)
-                    trades_df['exit_price'] = trades_df['exit_price'].round(2)
+                    # Built column-wise from the structured trade records
+                    # rather than row by row from the dict list
+                    trades_df = pd.DataFrame(records).round(
+                        {'pnl': 2, 'entry_price': 2, 'exit_price': 2}
+                    )
+                    trades_df['side'] = np.where(records['side'] == 1, 'long', 'short')
                     st.dataframe(trades_df, use_container_width=True)
 
 else:  # Arbitrage Scanner
@@ -568,16 +686,19 @@ else:  # Arbitrage Scanner
     
     if st.button("Scan for Opportunities", type="primary"):
         with st.spinner("Scanning exchanges..."):
-            all_opportunities = []
             historical_spreads = {}
-            
-            for symbol in scan_symbols:
-                # Get current opportunities
-                opportunities = arbitrage_detector.find_opportunities(symbol, exchanges)
-                all_opportunities.extend(opportunities)
-                
-                # Get historical spreads
-                spreads_df = arbitrage_detector.get_historical_spreads(symbol, exchanges)
+
+            # Historical spreads are fetched per symbol in the background
+            # while every live quote comes from one bulk ticker request per
+            # exchange, scanned as a single (symbol, exchange) price matrix
+            with ThreadPoolExecutor(max_workers=max(len(scan_symbols), 1)) as pool:
+                spreads = pool.map(
+                    lambda symbol: load_spreads(symbol, tuple(exchanges)),
+                    scan_symbols
+                )
+                all_opportunities = arbitrage_detector.find_opportunities_batch(scan_symbols, exchanges)
+
+            for symbol, spreads_df in zip(scan_symbols, spreads):
                 if not spreads_df.empty:
                     historical_spreads[symbol] = spreads_df
             
@@ -603,21 +724,25 @@ else:  # Arbitrage Scanner
                 for symbol, spreads_df in historical_spreads.items():
                     st.write(f"**{symbol} Spread History**")
                     
-                    fig = go.Figure()
-                    for col in spreads_df.columns:
-                        fig.add_trace(go.Scatter(
-                            x=spreads_df.index,
-                            y=spreads_df[col],
-                            name=col,
-                            line=dict(width=1)
-                        ))
-                    
-                    fig.update_layout(
-                        template="plotly_dark",
-                        height=400,
-                        yaxis_title="Spread (%)",
-                        showlegend=True
-                    )
+                    # Every pair's trace and the layout go into the figure in
+                    # one construction, validated once
+                    def build_spread_chart():
+                        x = spreads_df.index.to_numpy()
+                        return go.Figure(
+                            data=[
+                                go.Scattergl(x=x, y=values, name=col, line=dict(width=1))
+                                for col, values in zip(spreads_df.columns, spreads_df.to_numpy(np.float32).T)
+                            ],
+                            layout=dict(
+                                template="plotly_dark",
+                                height=400,
+                                yaxis_title="Spread (%)",
+                                showlegend=True
+                            )
+                        )
+
+                    key = ('spread', symbol, tuple(spreads_df.columns), spreads_df.index[-1], len(spreads_df))
+                    fig = cached_figure(key, build_spread_chart)
                     
                     st.plotly_chart(fig, use_container_width=True)
                     
@@ -0,0 +1,16 @@
+"""Numba decorators with a pure-Python fallback when numba is not installed"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit supporting bare and called forms"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+    prange = range
+
+__all__ = ['njit', 'prange', 'NUMBA_AVAILABLE']
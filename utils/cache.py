@@ -0,0 +1,194 @@
+import os
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+_redis_client = None
+_redis_checked = False
+
+# Concurrent misses are coalesced through a fixed pool of locks striped by key
+LOCK_STRIPES = 64
+
+def get_redis():
+    """Get the shared Redis client configured via REDIS_URL, if any"""
+    global _redis_client, _redis_checked
+
+    if not _redis_checked:
+        _redis_checked = True
+        url = os.getenv('REDIS_URL')
+        if url:
+            try:
+                import redis
+                client = redis.Redis.from_url(url)
+                client.ping()
+                _redis_client = client
+            except Exception as e:
+                logging.warning(f"Redis cache disabled: {e}")
+
+    return _redis_client
+
+def dumps_frame(df) -> bytes:
+    """Serialize a DataFrame as a zstd-compressed Arrow IPC stream"""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression='zstd')
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def loads_frame(payload: bytes):
+    """Deserialize a DataFrame written by dumps_frame"""
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(payload).read_all().to_pandas()
+
+class DiskFrameCache:
+    """DataFrames stored as parquet files that expire after a fixed time-to-live"""
+    def __init__(self, directory: str, ttl: float):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, re.sub(r'[^\w.-]', '_', key) + '.parquet')
+
+    def get(self, key: str):
+        """Get a cached frame, or None when missing, expired or unreadable"""
+        import pandas as pd
+
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) >= self.ttl:
+                return None
+            return pd.read_parquet(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.error(f"Error reading {key} from disk cache: {e}")
+            return None
+
+    def set(self, key: str, df):
+        """Store a frame, replacing any previous file atomically"""
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            df.to_parquet(tmp)
+            os.replace(tmp, path)
+        except Exception as e:
+            logging.error(f"Error writing {key} to disk cache: {e}")
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed time-to-live"""
+    def __init__(self, maxsize: int = 10_000, ttl: float = 10.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a cached value, or default when missing or expired"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entries when full"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+def dumps_json(value) -> bytes:
+    """Serialize plain data (dicts, lists, numbers, strings) as JSON"""
+    return json.dumps(value, separators=(',', ':')).encode()
+
+def loads_json(payload: bytes):
+    """Deserialize a value written by dumps_json"""
+    return json.loads(payload)
+
+class TieredCache:
+    """In-process TTL cache (L1) backed by an optional shared Redis tier (L2)"""
+    def __init__(self, namespace: str, ttl: float, maxsize: int = 10_000,
+                 dumps: Optional[Callable[[Any], bytes]] = None,
+                 loads: Optional[Callable[[bytes], Any]] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        # Redis is shared, so the default codec is data-only JSON rather than pickle
+        self.dumps = dumps or dumps_json
+        self.loads = loads or loads_json
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def _redis_key(self, key: str) -> str:
+        return f"crossx:{self.namespace}:{key}"
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        return self._locks[hash(key) % LOCK_STRIPES]
+
+    def get(self, key: str) -> Any:
+        """Get a value from L1, falling back to Redis and promoting hits"""
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        client = get_redis()
+        if client is None:
+            return None
+
+        try:
+            payload = client.get(self._redis_key(key))
+            if payload is None:
+                return None
+            value = self.loads(payload)
+        except Exception as e:
+            logging.error(f"Error reading {key} from Redis: {e}")
+            return None
+
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        """Store a value in both tiers"""
+        self.local.set(key, value)
+
+        client = get_redis()
+        if client is None:
+            return
+
+        try:
+            client.setex(self._redis_key(key), max(1, int(self.ttl)), self.dumps(value))
+        except Exception as e:
+            logging.error(f"Error writing {key} to Redis: {e}")
+
+    def get_or_set(self, key: str, compute: Callable[[], Any]) -> Optional[Any]:
+        """Get a cached value or compute it once; None results are not cached"""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        # Concurrent misses on the same key wait for a single computation
+        with self._lock_for(key):
+            value = self.get(key)
+            if value is not None:
+                return value
+
+            value = compute()
+            if value is not None:
+                self.set(key, value)
+            return value
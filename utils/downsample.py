@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+from utils._njit import njit
+
+@njit(cache=True)
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets"""
+    n = x.shape[0]
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[n_out - 1] = n - 1
+
+    # Interior points are split into n_out - 2 equal buckets; each keeps the
+    # point forming the largest triangle with the previous pick and the
+    # mean of the next bucket
+    bucket = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(end, next_end):
+            avg_x += x[j]
+            avg_y += y[j]
+        count = next_end - end
+        avg_x /= count
+        avg_y /= count
+
+        # NaN areas never win, so a gap keeps the bucket's first point
+        best = start
+        best_area = -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best_area = area
+                best = j
+
+        indices[i + 1] = best
+        a = best
+
+    return indices
+
+def lttb(series: pd.Series, max_points: int) -> pd.Series:
+    """Downsample a time series to at most `max_points` points, preserving its visual shape"""
+    if len(series) <= max_points or max_points < 3:
+        return series
+
+    index = series.index
+    x = (index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()).astype(np.float64)
+    y = series.to_numpy(np.float64)
+    return series.iloc[_lttb_indices(x, y, max_points)]
+
+def downsample_ohlcv(df: pd.DataFrame, max_bars: int) -> pd.DataFrame:
+    """Merge consecutive bars so at most `max_bars` remain, keeping the OHLCV semantics of each bucket"""
+    n = len(df)
+    if n <= max_bars:
+        return df
+
+    # Equal-count buckets, reduced in one pass per column
+    starts = np.unique(np.linspace(0, n, max_bars + 1).astype(np.int64)[:-1])
+    ends = np.append(starts[1:], n)
+
+    high = df['high'].to_numpy(np.float64)
+    low = df['low'].to_numpy(np.float64)
+    return pd.DataFrame({
+        'open': df['open'].to_numpy(np.float64)[starts],
+        'high': np.fmax.reduceat(high, starts),
+        'low': np.fmin.reduceat(low, starts),
+        'close': df['close'].to_numpy(np.float64)[ends - 1],
+        'volume': np.add.reduceat(df['volume'].to_numpy(np.float64), starts)
+    }, index=df.index[starts])
+
+def resample_ohlcv(df: pd.DataFrame, max_bars: int) -> pd.DataFrame:
+    """Resample bars to the finest multiple of their timeframe that fits in `max_bars`"""
+    n = len(df)
+    if n <= max_bars or n < 2:
+        return df
+
+    # Other columns (indicators) keep their value at the close of each new bar
+    spacing = df.index.to_series().diff().median()
+    rule = spacing * -(-n // max_bars)
+    agg = dict.fromkeys(df.columns, 'last')
+    agg.update(open='first', high='max', low='min', close='last', volume='sum')
+    return df.resample(rule, origin='start').agg(agg).dropna(subset=['close'])
@@ -1,7 +1,184 @@
+import sys
 import pandas as pd
 import numpy as np
 from typing import Dict, List
-import pandas_ta as ta
+from utils._njit import njit
+
+# The kernels below reproduce pandas_ta's non-TA-Lib results (rolling-mean
+# SMAs, SMA-seeded EMAs, Wilder smoothing via ewm(adjust=False)) in single
+# compiled loops
+
+# Columns written by MarketMetrics.calculate_indicators, in kernel row order
+INDICATOR_COLUMNS = (
+    'sma_20', 'sma_50', 'sma_200', 'ema_8', 'ema_21', 'ema_55',
+    'rsi', 'macd_line', 'macd_signal', 'macd_hist', 'atr'
+)
+
+@njit(cache=True)
+def _sma(values: np.ndarray, length: int) -> np.ndarray:
+    """Series.rolling(length).mean() over a float array, with pandas' compensated running sum"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    compensation = 0.0
+    count = 0
+    for i in range(n):
+        v = values[i]
+        if v == v:
+            y = v - compensation
+            t = total + y
+            compensation = t - total - y
+            total = t
+            count += 1
+        if i >= length:
+            v = values[i - length]
+            if v == v:
+                y = -v - compensation
+                t = total + y
+                compensation = t - total - y
+                total = t
+                count -= 1
+        if count >= length:
+            out[i] = total / count
+    return out
+
+@njit(cache=True)
+def _ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Series.ewm(alpha=alpha, adjust=False).mean() over a float array"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    started = False
+    weighted = 0.0
+    old_wt = 1.0
+    for i in range(n):
+        v = values[i]
+        if not started:
+            if v == v:
+                weighted = v
+                started = True
+                out[i] = v
+            continue
+
+        # Gaps decay the previous value's weight like pandas (ignore_na=False)
+        old_wt *= 1.0 - alpha
+        if v == v:
+            weighted = (old_wt * weighted + alpha * v) / (old_wt + alpha)
+            old_wt = 1.0
+        out[i] = weighted
+    return out
+
+@njit(cache=True)
+def _seed_with_sma(values: np.ndarray, length: int) -> np.ndarray:
+    """Copy of values whose first `length` entries collapse into their mean at length - 1"""
+    seeded = values.copy()
+    seeded[:length - 1] = np.nan
+    seeded[length - 1] = np.nanmean(values[:length])
+    return seeded
+
+@njit(cache=True)
+def _ema(close: np.ndarray, length: int) -> np.ndarray:
+    """SMA-seeded exponential moving average"""
+    if close.shape[0] < length:
+        return np.full(close.shape[0], np.nan)
+    return _ewm(_seed_with_sma(close, length), 2.0 / (length + 1))
+
+@njit(cache=True)
+def _rsi(close: np.ndarray, length: int) -> np.ndarray:
+    """Relative strength index with Wilder smoothing"""
+    n = close.shape[0]
+    if n < length + 1:
+        return np.full(n, np.nan)
+
+    gains = np.full(n, np.nan)
+    losses = np.full(n, np.nan)
+    for i in range(1, n):
+        change = close[i] - close[i - 1]
+        gains[i] = change if change > 0 else 0.0
+        losses[i] = -change if change < 0 else 0.0
+        if change != change:
+            gains[i] = np.nan
+            losses[i] = np.nan
+
+    avg_gain = _ewm(gains, 1.0 / length)
+    avg_loss = _ewm(losses, 1.0 / length)
+    return 100 * avg_gain / (avg_gain + avg_loss)
+
+@njit(cache=True)
+def _macd(close: np.ndarray, fast: int, slow: int, signal: int):
+    """MACD line, signal line and histogram"""
+    n = close.shape[0]
+    line = np.full(n, np.nan)
+    signal_line = np.full(n, np.nan)
+    if n < slow + signal - 1:
+        return line, signal_line, line - signal_line
+
+    line = _ema(close, fast) - _ema(close, slow)
+
+    # The signal EMA starts from the first valid MACD value
+    first = 0
+    while first < n and line[first] != line[first]:
+        first += 1
+    signal_line[first:] = _ema(line[first:], signal)
+    return line, signal_line, line - signal_line
+
+@njit(cache=True)
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int, epsilon: float) -> np.ndarray:
+    """Average true range with Wilder smoothing"""
+    n = close.shape[0]
+    if n < length + 1:
+        return np.full(n, np.nan)
+
+    hl_range = high - low
+    if np.any(hl_range == 0):
+        hl_range += epsilon
+
+    true_range = np.empty(n)
+    true_range[0] = abs(hl_range[0])
+    for i in range(1, n):
+        true_range[i] = max(abs(hl_range[i]), abs(high[i] - close[i - 1]), abs(close[i - 1] - low[i]))
+
+    return _ewm(_seed_with_sma(true_range, length), 1.0 / length)
+
+@njit(cache=True)
+def _indicators(high: np.ndarray, low: np.ndarray, close: np.ndarray, epsilon: float) -> np.ndarray:
+    """Every indicator column in one compiled call, one row per INDICATOR_COLUMNS entry"""
+    out = np.empty((len(INDICATOR_COLUMNS), close.shape[0]))
+    out[0] = _sma(close, 20)
+    out[1] = _sma(close, 50)
+    out[2] = _sma(close, 200)
+    out[3] = _ema(close, 8)
+    out[4] = _ema(close, 21)
+    out[5] = _ema(close, 55)
+    out[6] = _rsi(close, 14)
+    out[7], out[8], out[9] = _macd(close, 12, 26, 9)
+    out[10] = _atr(high, low, close, 14, epsilon)
+    return out
+
+@njit(cache=True)
+def _pairwise_spreads(prices: np.ndarray, threshold: float):
+    """Percent spread for every exchange pair i < j, plus the pairs whose absolute spread exceeds `threshold`"""
+    n = prices.shape[0]
+    spreads = np.full((n, n), np.nan)
+    hit_i = np.empty(n * (n - 1) // 2, dtype=np.int64)
+    hit_j = np.empty_like(hit_i)
+    hits = 0
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            spread = (prices[j] - prices[i]) / prices[i] * 100
+            spreads[i, j] = spread
+            if abs(spread) > threshold:
+                hit_i[hits] = i
+                hit_j[hits] = j
+                hits += 1
+
+    return spreads, hit_i[:hits], hit_j[:hits]
+
+def warm_up_kernels():
+    """Compile the indicator and spread kernels, or load them from numba's on-disk cache, ahead of first use"""
+    prices = np.ones(4)
+    _indicators(prices, prices, prices, sys.float_info.epsilon)
+    _pairwise_spreads(prices, 0.5)
 
 class MarketMetrics:
     @staticmethod
@@ -10,26 +187,17 @@ class MarketMetrics:
         if df.empty:
             return df
             
-        # Moving Averages
-        df['sma_20'] = ta.sma(df['close'], length=20)
-        df['sma_50'] = ta.sma(df['close'], length=50)
-        df['sma_200'] = ta.sma(df['close'], length=200)
-        
-        df['ema_8'] = ta.ema(df['close'], length=8)
-        df['ema_21'] = ta.ema(df['close'], length=21)
-        df['ema_55'] = ta.ema(df['close'], length=55)
-        
-        # RSI
-        df['rsi'] = ta.rsi(df['close'], length=14)
-        
-        # MACD
-        macd = ta.macd(df['close'])
-        df['macd_line'] = macd['MACD_12_26_9']
-        df['macd_signal'] = macd['MACDs_12_26_9']
-        df['macd_hist'] = macd['MACDh_12_26_9']
-        
-        # ATR for volatility
-        df['atr'] = ta.atr(df['high'], df['low'], df['close'], length=14)
+        # Moving averages, RSI, MACD and ATR come out of a single compiled
+        # call over the raw arrays; contiguous copies keep the kernel on the
+        # one specialization warm_up_kernels compiles, whatever the frame's
+        # block layout
+        close = np.ascontiguousarray(df['close'].to_numpy(np.float64))
+        high = np.ascontiguousarray(df['high'].to_numpy(np.float64))
+        low = np.ascontiguousarray(df['low'].to_numpy(np.float64))
+        values = _indicators(high, low, close, sys.float_info.epsilon)
+
+        for name, column in zip(INDICATOR_COLUMNS, values):
+            df[name] = column
         
         return df
 
@@ -46,23 +214,27 @@ class MarketMetrics:
                 'volatility_24h': 0
             }
         
+        # Scalar reads and tail reductions work on the raw arrays
+        close = df['close'].to_numpy()
+        
         # Get latest price
-        last_price = df['close'].iloc[-1]
+        last_price = close[-1]
         
         # Calculate 24h change
-        price_24h_ago = df['close'].iloc[-24] if len(df) >= 24 else df['close'].iloc[0]
+        price_24h_ago = close[-24] if close.size >= 24 else close[0]
         price_change = ((last_price - price_24h_ago) / price_24h_ago) * 100
         
         # Get 24h high and low
-        high_24h = df['high'].tail(24).max()
-        low_24h = df['low'].tail(24).min()
+        high_24h = np.nanmax(df['high'].to_numpy()[-24:])
+        low_24h = np.nanmin(df['low'].to_numpy()[-24:])
         
         # Calculate 24h volume
-        volume_24h = df['volume'].tail(24).sum()
+        volume_24h = np.nansum(df['volume'].to_numpy()[-24:])
         
-        # Calculate volatility (standard deviation of returns)
-        returns = df['close'].pct_change().tail(24)
-        volatility = returns.std() * 100  # Convert to percentage
+        # Calculate volatility (standard deviation of the last 24 returns)
+        window = close[-25:]
+        returns = np.diff(window) / window[:-1]
+        volatility = returns.std(ddof=1) * 100 if returns.size > 1 else np.nan  # Convert to percentage
         
         return {
             'last_price': last_price,
@@ -79,11 +251,11 @@ class MarketMetrics:
         if df.empty:
             return {}
             
-        rsi = df['rsi'].iloc[-1]
-        macd = df['macd_line'].iloc[-1]
-        macd_signal = df['macd_signal'].iloc[-1]
+        rsi = df['rsi'].to_numpy()[-1]
+        macd = df['macd_line'].to_numpy()[-1]
+        macd_signal = df['macd_signal'].to_numpy()[-1]
         
-        trend = 'bullish' if df['close'].iloc[-1] > df['sma_50'].iloc[-1] else 'bearish'
+        trend = 'bullish' if df['close'].to_numpy()[-1] > df['sma_50'].to_numpy()[-1] else 'bearish'
         momentum = 'positive' if rsi > 50 else 'negative'
         signal = 'buy' if macd > macd_signal else 'sell'
         
@@ -99,41 +271,37 @@ class MarketMetrics:
     @staticmethod
     def calculate_arbitrage_metrics(prices: Dict[str, float]) -> Dict:
         """Calculate arbitrage opportunities between exchanges"""
-        opportunities = []
-        spreads = {}
-        
-        exchanges = list(prices.keys())
-        
-        for i, ex1 in enumerate(exchanges):
-            spreads[ex1] = {}
-            for ex2 in exchanges[i+1:]:
-                price1 = prices[ex1]
-                price2 = prices[ex2]
-                
-                spread = ((price2 - price1) / price1) * 100
-                spreads[ex1][ex2] = spread
-                
-                # Consider spreads above 0.5% as opportunities
-                if abs(spread) > 0.5:
-                    if price2 > price1:
-                        opportunities.append({
-                            'buy_exchange': ex1,
-                            'sell_exchange': ex2,
-                            'buy_price': price1,
-                            'sell_price': price2,
-                            'spread': spread
-                        })
-                    else:
-                        opportunities.append({
-                            'buy_exchange': ex2,
-                            'sell_exchange': ex1,
-                            'buy_price': price2,
-                            'sell_price': price1,
-                            'spread': -spread
-                        })
-        
+        names = list(prices)
+        values = list(prices.values())
+
+        # Consider spreads above 0.5% as opportunities
+        spread_mat, hit_i, hit_j = _pairwise_spreads(np.asarray(values, dtype=np.float64), 0.5)
+        spread_rows = spread_mat.tolist()
+        spreads = {
+            name: dict(zip(names[i + 1:], spread_rows[i][i + 1:])) for i, name in enumerate(names)
+        }
+
+        # Buy on the cheaper side of each pair (a positive spread means the
+        # column exchange is dearer), largest spread first
+        hit_spreads = spread_mat[hit_i, hit_j]
+        order = np.argsort(-np.abs(hit_spreads), kind='stable')
+        hit_i, hit_j, hit_spreads = hit_i[order], hit_j[order], hit_spreads[order]
+        dearer = hit_spreads > 0
+        buys = np.where(dearer, hit_i, hit_j).tolist()
+        sells = np.where(dearer, hit_j, hit_i).tolist()
+        opportunities = [
+            {
+                'buy_exchange': names[buy],
+                'sell_exchange': names[sell],
+                'buy_price': values[buy],
+                'sell_price': values[sell],
+                'spread': spread
+            }
+            for buy, sell, spread in zip(buys, sells, np.abs(hit_spreads).tolist())
+        ]
+
         return {
-            'opportunities': sorted(opportunities, key=lambda x: abs(x['spread']), reverse=True),
+            'opportunities': opportunities,
             'spreads': spreads
         }
 
@@ -146,38 +314,40 @@ class MarketMetrics:
         # Calculate price range
         price_min = df['low'].min()
         price_max = df['high'].max()
-        price_step = (price_max - price_min) / price_levels
         
         # Create price bins
         price_bins = np.linspace(price_min, price_max, price_levels + 1)
         
-        # Calculate volume profile
-        volume_profile = pd.cut(df['close'], 
-                              bins=price_bins, 
-                              labels=price_bins[:-1],
-                              include_lowest=True)
-        
-        volume_by_price = df.groupby(volume_profile)['volume'].sum()
+        # Volume-weighted histogram of closes over right-closed bins (the
+        # lowest bin also takes its left edge); closes outside the range or
+        # missing are dropped, missing volume counts as zero
+        close = df['close'].to_numpy(np.float64)
+        volume = np.nan_to_num(df['volume'].to_numpy(np.float64))
+        bins = np.searchsorted(price_bins, close, side='left') - 1
+        bins[close == price_bins[0]] = 0
+        valid = (bins >= 0) & (bins < price_levels)
+        volume_by_price = np.bincount(bins[valid], weights=volume[valid], minlength=price_levels)
+        levels = price_bins[:-1]
         
         # Find point of control (price level with highest volume)
-        poc_price = volume_by_price.idxmax()
-        poc_volume = volume_by_price.max()
+        poc = volume_by_price.argmax()
         
-        # Calculate value area (70% of total volume)
-        total_volume = volume_by_price.sum()
-        sorted_volumes = volume_by_price.sort_values(ascending=False)
-        cumsum_volume = sorted_volumes.cumsum()
-        value_area_threshold = total_volume * 0.7
-        value_area_prices = sorted_volumes[cumsum_volume <= value_area_threshold].index
+        # Calculate value area (70% of total volume); the point of control is
+        # always part of it
+        order = np.argsort(-volume_by_price, kind='stable')
+        cumsum_volume = np.cumsum(volume_by_price[order])
+        in_value_area = cumsum_volume <= volume_by_price.sum() * 0.7
+        in_value_area[0] = True
+        value_area_prices = levels[order[in_value_area]]
         
         return {
-            'volume_profile': volume_by_price.to_dict(),
+            'volume_profile': dict(zip(levels.tolist(), volume_by_price.tolist())),
             'point_of_control': {
-                'price': poc_price,
-                'volume': poc_volume
+                'price': float(levels[poc]),
+                'volume': float(volume_by_price[poc])
             },
             'value_area': {
-                'low': min(value_area_prices),
-                'high': max(value_area_prices)
+                'low': float(value_area_prices.min()),
+                'high': float(value_area_prices.max())
             }
         }
\ No newline at end of file
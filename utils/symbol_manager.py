@@ -1,33 +1,143 @@
 import ccxt
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+from operator import itemgetter
 import logging
-from pycoingecko import CoinGeckoAPI
+import os
+import threading
 import pandas as pd
+import orjson
+import requests
 import time
 
+COINGECKO_MARKETS_URL = 'https://api.coingecko.com/api/v3/coins/markets'
+TOP_COINS_TTL = 3600
+
 class SymbolManager:
-    def __init__(self):
-        self.cg = CoinGeckoAPI()
+    def __init__(self, cache_path: Optional[str] = None, max_workers: int = 8):
         self.top_coins_cache = {}
+        self._top_bases = set()
+        self._mcap_by_base = {}
         self.exchange_symbols_cache = {}
         self.last_update = 0
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        # Exchange clients and their markets, shared by every quote/filter
+        # combination so each exchange loads its markets once per 5 minutes
+        self.exchanges = {}
+        self.markets_cache = {}
+        self._markets_locks = {}
+        self._lock = threading.Lock()
+
+        # Symbol lists and the CoinGecko ranking persisted as JSON so a restart
+        # within the cache window skips the downloads
+        self.cache_path = cache_path
+        self.top_coins_path = (
+            os.path.join(os.path.dirname(cache_path), 'top_coins.json') if cache_path else None
+        )
+        self._load_symbols_cache()
         self._load_top_coins()
+
+    def close(self):
+        """Release the market download worker threads"""
+        self.executor.shutdown(wait=False)
+
+    def __del__(self):
+        # Managers dropped from a resource cache must not leave idle threads behind
+        executor = getattr(self, 'executor', None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _load_symbols_cache(self):
+        """Restore persisted exchange symbol lists, if any"""
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path) as f:
+                self.exchange_symbols_cache = {
+                    key: (cache_time, symbols) for key, (cache_time, symbols) in json.load(f).items()
+                }
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"Error reading symbol cache: {e}")
+
+    def _save_symbols_cache(self):
+        """Persist exchange symbol lists, replacing the previous file atomically"""
+        if not self.cache_path:
+            return
+        tmp = f"{self.cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with self._lock:
+                snapshot = dict(self.exchange_symbols_cache)
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with open(tmp, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.cache_path)
+        except Exception as e:
+            logging.error(f"Error writing symbol cache: {e}")
+
+    def _load_markets(self, exchange_id: str) -> Dict:
+        """Markets for an exchange, loaded at most once per 5 minutes"""
+        with self._lock:
+            lock = self._markets_locks.setdefault(exchange_id, threading.Lock())
+
+        # Concurrent callers for the same exchange wait for a single download
+        with lock:
+            cached = self.markets_cache.get(exchange_id)
+            if cached is not None and time.time() - cached[0] < 300:
+                return cached[1]
+
+            exchange = self.exchanges.get(exchange_id)
+            if exchange is None:
+                exchange = getattr(ccxt, exchange_id)({'enableRateLimit': True})
+                self.exchanges[exchange_id] = exchange
+
+            markets = exchange.load_markets(reload=cached is not None)
+            self.markets_cache[exchange_id] = (time.time(), markets)
+            return markets
     
+    def _fetch_top_coins(self) -> List[Dict]:
+        """Top 100 coins by market cap, from disk if fresh, else from CoinGecko"""
+        if self.top_coins_path:
+            try:
+                if time.time() - os.path.getmtime(self.top_coins_path) < TOP_COINS_TTL:
+                    with open(self.top_coins_path, 'rb') as f:
+                        return orjson.loads(f.read())
+            except FileNotFoundError:
+                pass
+
+        # Use USD as the base currency for market cap data
+        response = requests.get(COINGECKO_MARKETS_URL, params={
+            'vs_currency': 'usd',
+            'order': 'market_cap_desc',
+            'per_page': 100,
+            'sparkline': 'false'
+        }, timeout=10)
+        response.raise_for_status()
+        coins = orjson.loads(response.content)
+
+        if self.top_coins_path:
+            tmp = f"{self.top_coins_path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.top_coins_path) or '.', exist_ok=True)
+                with open(tmp, 'wb') as f:
+                    f.write(response.content)
+                os.replace(tmp, self.top_coins_path)
+            except Exception as e:
+                logging.error(f"Error writing top coins cache: {e}")
+        return coins
+
     def _load_top_coins(self):
         """Load top 100 coins by market cap from CoinGecko"""
         # Refresh cache every hour
         current_time = time.time()
-        if current_time - self.last_update < 3600 and self.top_coins_cache:
+        if current_time - self.last_update < TOP_COINS_TTL and self.top_coins_cache:
             return
 
         try:
-            # Use USD as the base currency for market cap data
-            coins = self.cg.get_coins_markets(
-                vs_currency='usd',
-                order='market_cap_desc',
-                per_page=100,
-                sparkline=False
-            )
+            coins = self._fetch_top_coins()
             
             # Create cache with both symbol and id for better matching
             self.top_coins_cache = {}
@@ -48,6 +158,15 @@ class SymbolManager:
                     'ETH': {'symbol': 'ETH', 'name': 'Ethereum'},
                 }
 
+        self._index_top_coins()
+
+    def _index_top_coins(self):
+        """Precompute the top-coin lookups used when filtering and sorting symbols"""
+        self._top_bases = set(self.top_coins_cache)
+        self._mcap_by_base = {
+            base: coin.get('market_cap') or 0 for base, coin in self.top_coins_cache.items()
+        }
+
     def get_exchange_symbols(self, exchange_id: str, quote_currency: str = 'USDT', 
                            top_coins_only: bool = False) -> List[str]:
         """Get available trading pairs for an exchange"""
@@ -61,40 +180,30 @@ class SymbolManager:
                 return symbols
             
         try:
-            exchange_class = getattr(ccxt, exchange_id)
-            exchange = exchange_class({'enableRateLimit': True})
-            markets = exchange.load_markets()
+            markets = self._load_markets(exchange_id)
             
-            # Filter for quote currency and normalize symbols
-            symbols = []
-            for symbol, market in markets.items():
-                if not isinstance(market, dict):
+            # Filter for quote currency and normalize symbols, reading each
+            # market's quote volume in the same pass
+            pairs = []
+            for market in markets.values():
+                if not isinstance(market, dict) or market.get('quote') != quote_currency:
                     continue
                     
                 base = market.get('base', '')
-                quote = market.get('quote', '')
-                
-                if quote == quote_currency:
-                    if top_coins_only:
-                        base_upper = base.upper()
-                        # Check if base currency is in top coins
-                        if base_upper in self.top_coins_cache:
-                            symbols.append(f"{base}/{quote}")
-                    else:
-                        symbols.append(f"{base}/{quote}")
+                # Check if base currency is in top coins
+                if top_coins_only and base.upper() not in self._top_bases:
+                    continue
+
+                volume = float(market.get('info', {}).get('quoteVolume') or 0)
+                pairs.append((f"{base}/{quote_currency}", volume))
             
-            # Sort by volume if available
-            if markets and symbols:
-                volume_data = {}
-                for s in symbols:
-                    market = markets.get(s.replace('/', ''))
-                    if market and isinstance(market, dict):
-                        volume = float(market.get('info', {}).get('quoteVolume', 0))
-                        volume_data[s] = volume
-                
-                symbols.sort(key=lambda s: volume_data.get(s, 0), reverse=True)
+            # Sort by volume where the exchange reports it
+            pairs.sort(key=itemgetter(1), reverse=True)
+            symbols = [symbol for symbol, _ in pairs]
             
-            self.exchange_symbols_cache[cache_key] = (current_time, symbols)
+            with self._lock:
+                self.exchange_symbols_cache[cache_key] = (current_time, symbols)
+            self._save_symbols_cache()
             return symbols
             
         except Exception as e:
@@ -107,31 +216,39 @@ class SymbolManager:
         if not exchanges:
             return []
             
-        all_symbols = [
-            set(self.get_exchange_symbols(ex, quote_currency, top_coins_only))
+        # Each exchange's markets are a network round trip, so they load
+        # concurrently; the intersection shrinks as each list arrives and
+        # stops waiting once nothing is left in common
+        futures = [
+            self.executor.submit(self.get_exchange_symbols, ex, quote_currency, top_coins_only)
             for ex in exchanges
         ]
-        
-        if not all_symbols:
-            return []
-            
-        common_symbols = set.intersection(*all_symbols)
+        common_symbols = None
+        for future in as_completed(futures):
+            symbols = future.result()
+            if common_symbols is None:
+                common_symbols = set(symbols)
+            else:
+                common_symbols.intersection_update(symbols)
+            if not common_symbols:
+                for pending in futures:
+                    pending.cancel()
+                return []
         
         # If using top coins, ensure they're in our cache
+        top_bases = self._top_bases
         if top_coins_only:
             common_symbols = {
                 s for s in common_symbols
-                if s.split('/')[0] in self.top_coins_cache
+                if s.partition('/')[0] in top_bases
             }
         
         # Sort by market cap if possible
         if self.top_coins_cache:
+            mcap = self._mcap_by_base
             return sorted(
-                list(common_symbols),
-                key=lambda s: self.top_coins_cache.get(
-                    s.split('/')[0],
-                    {'market_cap': 0}
-                ).get('market_cap', 0),
+                common_symbols,
+                key=lambda s: mcap.get(s.partition('/')[0], 0),
                 reverse=True
             )
         